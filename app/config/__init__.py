@@ -1,5 +1,5 @@
 """Configuration module."""
 
-from .settings import settings
+from .settings import Settings, get_settings, settings
 
-__all__ = ["settings"]
+__all__ = ["Settings", "get_settings", "settings"]
@@ -1,19 +1,29 @@
 """Application configuration settings."""
 
 import os
-from typing import List, Optional, Union
-from pydantic_settings import BaseSettings
-from pydantic import validator, Field
+from functools import cached_property, lru_cache
+from typing import FrozenSet, Optional, Tuple
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import field_validator, Field
 
 
 class Settings(BaseSettings):
     """Application settings with production-level security."""
 
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False, frozen=True)
+
     # OpenAI Configuration
     openai_api_key: str = Field(..., min_length=1, description="OpenAI API key")
     openai_model: str = Field(default="gpt-3.5-turbo", description="OpenAI model to use")
     openai_max_tokens: int = Field(default=1000, ge=1, le=8000, description="Maximum tokens for OpenAI")
     openai_temperature: float = Field(default=0.1, ge=0.0, le=2.0, description="OpenAI temperature")
+    openai_max_connections: int = Field(default=100, ge=1, description="Pooled HTTP connections to the OpenAI API")
+    openai_keepalive_expiry: float = Field(default=60.0, ge=0.0, description="Seconds an idle OpenAI connection is kept open")
+    openai_batch_max_size: int = Field(default=1, ge=1, le=16, description="Structured diagnoses per OpenAI call (1 disables batching)")
+    openai_batch_max_wait_ms: int = Field(default=25, ge=0, le=1000, description="Maximum wait for a structured diagnosis batch to fill")
+    openai_max_output_tokens: int = Field(default=4096, ge=1, description="Output token limit of the OpenAI model, capping batched calls")
+    diagnosis_cache_size: int = Field(default=4096, ge=1, description="Maximum cached structured diagnoses")
+    diagnosis_cache_ttl: int = Field(default=3600, ge=0, description="Structured diagnosis cache TTL in seconds (0 disables caching)")
 
     # Application Configuration
     app_name: str = Field(default="Tenderly AI Agent", description="Application name")
@@ -47,6 +57,8 @@ class Settings(BaseSettings):
     # Rate Limiting
     rate_limit_requests: int = Field(default=100, ge=1, description="Rate limit requests per window")
     rate_limit_window: int = Field(default=3600, ge=60, description="Rate limit window in seconds")
+    rate_limit_trust_forwarded_for: bool = Field(default=False, description="Identify clients by X-Forwarded-For (only behind a trusted proxy)")
+    rate_limit_exempt_networks: str = Field(default="", description="Comma-separated IPs/CIDRs exempt from rate limiting")
 
     # Redis Configuration
     redis_host: str = Field(default="localhost", description="Redis host")
@@ -54,6 +66,7 @@ class Settings(BaseSettings):
     redis_db: int = Field(default=0, ge=0, le=15, description="Redis database")
     redis_password: Optional[str] = Field(default=None, description="Redis password")
     redis_ssl: bool = Field(default=False, description="Use Redis SSL")
+    redis_max_connections: int = Field(default=64, ge=1, description="Redis connection pool size")
 
     # API Configuration
     api_prefix: str = Field(default="/api/v1", description="API prefix")
@@ -68,7 +81,8 @@ class Settings(BaseSettings):
         description="Medical disclaimer text"
     )
 
-    @validator("api_key")
+    @field_validator("api_key")
+    @classmethod
     def validate_api_key(cls, v):
         """Validate API key strength."""
         if v is None:
@@ -81,39 +95,44 @@ class Settings(BaseSettings):
                 raise ValueError("Default API key must be changed in production")
         return v
 
-    @property
-    def cors_origins_list(self) -> List[str]:
-        """Get CORS origins as a list."""
-        if isinstance(self.cors_origins, str):
-            return [origin.strip() for origin in self.cors_origins.split(",")]
-        return self.cors_origins
+    @cached_property
+    def cors_origins_list(self) -> Tuple[str, ...]:
+        """Get CORS origins as a tuple, parsed once."""
+        return tuple(origin.strip() for origin in self.cors_origins.split(","))
+    
+    @cached_property
+    def cors_origins_set(self) -> FrozenSet[str]:
+        """Get CORS origins as a frozenset for O(1) membership checks."""
+        return frozenset(self.cors_origins_list)
     
-    @property
-    def allowed_services_list(self) -> List[str]:
-        """Get allowed services as a list."""
-        if isinstance(self.allowed_services, str):
-            return [service.strip() for service in self.allowed_services.split(",")]
-        return self.allowed_services
+    @cached_property
+    def allowed_services_list(self) -> Tuple[str, ...]:
+        """Get allowed services as a tuple, parsed once."""
+        return tuple(service.strip() for service in self.allowed_services.split(","))
     
-    @property
-    def allowed_ips_list(self) -> List[str]:
-        """Get allowed IPs as a list."""
-        if isinstance(self.allowed_ips, str):
-            return [ip.strip() for ip in self.allowed_ips.split(",")]
-        return self.allowed_ips
-
-    @property
+    @cached_property
+    def allowed_ips_list(self) -> Tuple[str, ...]:
+        """Get allowed IPs as a tuple, parsed once."""
+        return tuple(ip.strip() for ip in self.allowed_ips.split(","))
+
+    @cached_property
+    def rate_limit_exempt_networks_list(self) -> Tuple[str, ...]:
+        """Get rate limit exempt networks as a tuple, parsed once."""
+        return tuple(net.strip() for net in self.rate_limit_exempt_networks.split(",") if net.strip())
+
+    @cached_property
     def redis_url(self) -> str:
-        """Get Redis connection URL."""
+        """Get Redis connection URL, built once."""
         protocol = "rediss" if self.redis_ssl else "redis"
         auth = f":{self.redis_password}@" if self.redis_password else ""
         return f"{protocol}://{auth}{self.redis_host}:{self.redis_port}/{self.redis_db}"
 
-    class Config:
-        """Pydantic configuration."""
-        env_file = ".env"
-        case_sensitive = False
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the process-wide settings instance, constructed once."""
+    return Settings()
 
 
 # Global settings instance
-settings = Settings()
+settings = get_settings()
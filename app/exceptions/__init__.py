@@ -3,6 +3,7 @@
 from .custom_exceptions import (
     BaseCustomException,
     OpenAIServiceError,
+    OpenAIResponseParseError,
     DiagnosisServiceError,
     AuthenticationError,
     RateLimitError,
@@ -12,6 +13,7 @@ from .custom_exceptions import (
 __all__ = [
     "BaseCustomException",
     "OpenAIServiceError",
+    "OpenAIResponseParseError",
     "DiagnosisServiceError",
     "AuthenticationError",
     "RateLimitError",
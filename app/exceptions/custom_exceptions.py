@@ -4,6 +4,8 @@
 class BaseCustomException(Exception):
     """Base exception class for custom exceptions."""
     
+    __slots__ = ("message", "error_code")
+    
     def __init__(self, message: str, error_code: str = None):
         """Initialize base exception."""
         super().__init__(message)
@@ -14,14 +16,28 @@ class BaseCustomException(Exception):
 class OpenAIServiceError(BaseCustomException):
     """Exception raised when OpenAI service fails."""
     
+    __slots__ = ()
+    
     def __init__(self, message: str):
         """Initialize OpenAI service error."""
         super().__init__(message, "OPENAI_SERVICE_ERROR")
 
 
+class OpenAIResponseParseError(OpenAIServiceError):
+    """Exception raised when an OpenAI response cannot be parsed."""
+    
+    __slots__ = ()
+    
+    def __init__(self, message: str):
+        """Initialize OpenAI response parse error."""
+        BaseCustomException.__init__(self, message, "OPENAI_RESPONSE_PARSE_ERROR")
+
+
 class DiagnosisServiceError(BaseCustomException):
     """Exception raised when diagnosis service fails."""
     
+    __slots__ = ()
+    
     def __init__(self, message: str):
         """Initialize diagnosis service error."""
         super().__init__(message, "DIAGNOSIS_SERVICE_ERROR")
@@ -30,6 +46,8 @@ class DiagnosisServiceError(BaseCustomException):
 class AuthenticationError(BaseCustomException):
     """Exception raised when authentication fails."""
     
+    __slots__ = ()
+    
     def __init__(self, message: str):
         """Initialize authentication error."""
         super().__init__(message, "AUTHENTICATION_ERROR")
@@ -38,6 +56,8 @@ class AuthenticationError(BaseCustomException):
 class RateLimitError(BaseCustomException):
     """Exception raised when rate limit is exceeded."""
     
+    __slots__ = ()
+    
     def __init__(self, message: str):
         """Initialize rate limit error."""
         super().__init__(message, "RATE_LIMIT_ERROR")
@@ -46,6 +66,8 @@ class RateLimitError(BaseCustomException):
 class ValidationError(BaseCustomException):
     """Exception raised when validation fails."""
     
+    __slots__ = ()
+    
     def __init__(self, message: str):
         """Initialize validation error."""
         super().__init__(message, "VALIDATION_ERROR")
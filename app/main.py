@@ -1,20 +1,29 @@
 """Main FastAPI application."""
 
+import time
+import orjson
 import uvicorn
 from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Optional
 from fastapi import FastAPI, HTTPException, Request
+from brotli_asgi import BrotliMiddleware
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
 
 from app.config.settings import settings
+from app.middleware.rate_limiter import ClientIdentifierMiddleware, RateLimitMiddleware, rate_limiter
 from app.routers import diagnosis_router, health_router
+from app.services.batcher import structured_diagnosis_batcher
+from app.services.openai_service import openai_service
 from app.utils.logger import get_logger, setup_logging
+from app.utils.request_body import BODY_SCHEMAS
 from app.exceptions.custom_exceptions import (
     BaseCustomException,
     OpenAIServiceError,
+    OpenAIResponseParseError,
     DiagnosisServiceError,
     AuthenticationError,
     RateLimitError,
@@ -37,11 +46,15 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Tenderly AI Agent service")
     logger.info(f"Environment: {settings.environment}")
     logger.info(f"Debug mode: {settings.debug}")
+    await rate_limiter.init_redis()
     
     yield
     
     # Shutdown
     logger.info("Shutting down Tenderly AI Agent service")
+    await structured_diagnosis_batcher.close()
+    await openai_service.close()
+    await rate_limiter.close()
 
 
 # Create FastAPI application
@@ -50,43 +63,89 @@ app = FastAPI(
     description=settings.app_description,
     version=settings.app_version,
     debug=settings.debug,
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
     lifespan=lifespan,
 )
 
 # Add middleware
+# Innermost, so throttled responses still get CORS headers and a resolved client identifier
+app.add_middleware(
+    RateLimitMiddleware,
+    paths=(
+        f"{settings.api_prefix}/diagnosis/",
+        f"{settings.api_prefix}/diagnosis/structure",
+        f"{settings.api_prefix}/diagnosis/structure/stream",
+    ),
+)
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.cors_origins_list,
+    # Starlette only tests membership on this, so a frozenset avoids a list scan per request
+    allow_origins=settings.cors_origins_set,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
 )
 
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(ClientIdentifierMiddleware, trust_forwarded_for=settings.rate_limit_trust_forwarded_for)
+
+# Brotli for clients that accept "br"; falls back to gzip for the rest. The NDJSON
+# stream is left uncompressed since gzip would hold events back in its buffer.
+app.add_middleware(
+    BrotliMiddleware,
+    quality=4,
+    minimum_size=1000,
+    gzip_fallback=True,
+    excluded_handlers=[r"/diagnosis/structure/stream$"],
+)
+
+
+def _request_timestamp(request: Request) -> Optional[datetime]:
+    """Get the request start time; only called on the error path."""
+    timestamp_ns = getattr(request.state, "timestamp_ns", None)
+    if timestamp_ns is None:
+        return None
+    return datetime.fromtimestamp(timestamp_ns / 1e9, tz=timezone.utc)
+
+
+# Pre-serialized constant parts of error bodies; the open object is closed by _error_body
+_VALIDATION_ERROR_PREFIX = b'{"error":"Validation failed","detail":'
+_GENERIC_500_PREFIX = orjson.dumps(
+    {"error": "An unexpected error occurred", "detail": "Internal server error"}
+)[:-1]
+
+
+def _error_body(prefix: bytes, request: Request) -> bytes:
+    """Append the request timestamp to a pre-serialized error body prefix."""
+    return prefix + b',"timestamp":' + orjson.dumps(_request_timestamp(request)) + b"}"
 
 
 # Exception handlers
+# HTTP status per exception type; looked up by exact type, so subclasses need their own entry
+_EXCEPTION_STATUS_CODES = {
+    AuthenticationError: 401,
+    RateLimitError: 429,
+    OpenAIServiceError: 503,
+    OpenAIResponseParseError: 502,
+    DiagnosisServiceError: 503,
+}
+
+
 @app.exception_handler(BaseCustomException)
 async def custom_exception_handler(request: Request, exc: BaseCustomException):
     """Handle custom exceptions."""
     logger.error(f"Custom exception: {exc.message}")
     
-    status_code = 500
-    if isinstance(exc, AuthenticationError):
-        status_code = 401
-    elif isinstance(exc, RateLimitError):
-        status_code = 429
-    elif isinstance(exc, (OpenAIServiceError, DiagnosisServiceError)):
-        status_code = 503
+    status_code = _EXCEPTION_STATUS_CODES.get(type(exc), 500)
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status_code,
         content={
             "error": exc.message,
             "error_code": exc.error_code,
-            "timestamp": str(request.state.timestamp) if hasattr(request.state, 'timestamp') else None,
+            "timestamp": _request_timestamp(request),
         },
     )
 
@@ -94,15 +153,14 @@ async def custom_exception_handler(request: Request, exc: BaseCustomException):
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle validation errors."""
-    logger.error(f"Validation error: {exc.errors()}")
+    errors = exc.errors()
+    logger.error(f"Validation error: {errors}")
     
-    return JSONResponse(
+    # default=str covers validator exceptions carried in the error "ctx"
+    return Response(
+        content=_error_body(_VALIDATION_ERROR_PREFIX + orjson.dumps(errors, default=str), request),
         status_code=422,
-        content={
-            "error": "Validation failed",
-            "detail": exc.errors(),
-            "timestamp": str(request.state.timestamp) if hasattr(request.state, 'timestamp') else None,
-        },
+        media_type="application/json",
     )
 
 
@@ -111,12 +169,19 @@ async def general_exception_handler(request: Request, exc: Exception):
     """Handle general exceptions."""
     logger.error(f"Unexpected error: {exc}")
     
-    return JSONResponse(
+    if not settings.debug:
+        return Response(
+            content=_error_body(_GENERIC_500_PREFIX, request),
+            status_code=500,
+            media_type="application/json",
+        )
+    
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "An unexpected error occurred",
-            "detail": str(exc) if settings.debug else "Internal server error",
-            "timestamp": str(request.state.timestamp) if hasattr(request.state, 'timestamp') else None,
+            "detail": str(exc),
+            "timestamp": _request_timestamp(request),
         },
     )
 
@@ -125,16 +190,13 @@ async def general_exception_handler(request: Request, exc: Exception):
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     """Add request processing time header."""
-    import time
-    from datetime import datetime
-    
-    start_time = time.time()
-    request.state.timestamp = datetime.utcnow()
+    start_ns = time.perf_counter_ns()
+    request.state.timestamp_ns = time.time_ns()
     
     response = await call_next(request)
     
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
+    process_time_ns = time.perf_counter_ns() - start_ns
+    response.headers["X-Process-Time"] = f"{process_time_ns / 1e9:.6f}"
     
     return response
 
@@ -148,7 +210,6 @@ app.include_router(diagnosis_router, prefix=settings.api_prefix)
 @app.get("/")
 async def root():
     """Root endpoint."""
-    from datetime import datetime
     return {
         "message": "Tenderly AI Agent - Gynecology Diagnosis Service",
         "version": settings.app_version,
@@ -159,6 +220,38 @@ async def root():
     }
 
 
+_default_openapi = app.openapi
+
+
+def openapi_schema() -> dict:
+    """Build the OpenAPI schema once, adding bodies that routes parse themselves."""
+    if app.openapi_schema is None:
+        schemas = _default_openapi().setdefault("components", {}).setdefault("schemas", {})
+        for name, schema in BODY_SCHEMAS.items():
+            schemas.setdefault(name, schema)
+    return app.openapi_schema
+
+
+app.openapi = openapi_schema
+
+
+# OpenAPI schema, serialized on first request
+_openapi_body: Optional[bytes] = None
+
+
+async def openapi_json(request: Request) -> Response:
+    """Serve the OpenAPI schema from pre-serialized bytes."""
+    global _openapi_body
+    if _openapi_body is None:
+        _openapi_body = orjson.dumps(app.openapi())
+    return Response(content=_openapi_body, media_type="application/json")
+
+
+# FastAPI caches the schema dict but re-encodes it on every hit; swap in the bytes-backed route
+app.router.routes = [route for route in app.router.routes if getattr(route, "path", None) != app.openapi_url]
+app.add_route(app.openapi_url, openapi_json, include_in_schema=False)
+
+
 # Run the application
 if __name__ == "__main__":
     uvicorn.run(
@@ -168,4 +261,7 @@ if __name__ == "__main__":
         reload=settings.debug,
         workers=1 if settings.debug else settings.workers,
         log_level=settings.log_level.lower(),
+        # Installed via uvicorn[standard]; pinned so a missing extra fails loudly
+        loop="uvloop",
+        http="httptools",
     )
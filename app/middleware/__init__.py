@@ -1,11 +1,18 @@
 """Middleware module."""
 
 from .auth import get_current_user, get_current_user_optional
-from .rate_limiter import rate_limiter, check_rate_limit_dependency
+from .rate_limiter import (
+    ClientIdentifierMiddleware,
+    RateLimitMiddleware,
+    rate_limiter,
+    check_rate_limit_dependency,
+)
 
 __all__ = [
     "get_current_user",
     "get_current_user_optional",
+    "ClientIdentifierMiddleware",
+    "RateLimitMiddleware",
     "rate_limiter",
     "check_rate_limit_dependency",
 ]
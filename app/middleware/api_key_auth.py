@@ -1,6 +1,9 @@
 """API Key authentication middleware for service-to-service communication."""
 
-from typing import Optional
+import hmac
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+from cachetools import LRUCache
 from fastapi import HTTPException, status, Depends, Request
 from app.config.settings import settings
 from app.utils.logger import get_logger
@@ -8,7 +11,15 @@ from app.exceptions.custom_exceptions import AuthenticationError
 
 logger = get_logger(__name__)
 
-def verify_api_key(api_key: str, service_name: Optional[str] = None) -> dict:
+# Encoded once so each request only encodes the presented key
+_EXPECTED_API_KEY = (settings.api_key or "").encode("utf-8")
+_ALLOWED_SERVICES = frozenset(settings.allowed_services_list)
+
+# Read-only service information for (api_key, service_name) pairs that already
+# verified successfully; invalid keys are never stored.
+_VERIFIED_API_KEYS: LRUCache = LRUCache(maxsize=64)
+
+def verify_api_key(api_key: str, service_name: Optional[str] = None) -> Mapping[str, Any]:
     """
     Verify API key and return service information.
     
@@ -17,34 +28,39 @@ def verify_api_key(api_key: str, service_name: Optional[str] = None) -> dict:
         service_name: Optional service name for additional validation
         
     Returns:
-        Service information dictionary
+        Read-only service information mapping, shared between requests
         
     Raises:
         AuthenticationError: If API key is invalid
     """
     try:
-        # Check if API key matches the configured key
-        if not api_key or api_key != settings.api_key:
-            raise AuthenticationError("Invalid API key")
+        cache_key = (api_key, service_name)
+        auth_info = _VERIFIED_API_KEYS.get(cache_key)
+        if auth_info is None:
+            # Check if API key matches the configured key (constant-time comparison)
+            if not api_key or not hmac.compare_digest(api_key.encode("utf-8"), _EXPECTED_API_KEY):
+                raise AuthenticationError("Invalid API key")
+            
+            auth_info = MappingProxyType({
+                "service": service_name or "unknown",
+                "authenticated": True,
+                "api_key_valid": True,
+            })
+            _VERIFIED_API_KEYS[cache_key] = auth_info
         
         # Optional: Validate service name if provided
-        allowed_services = settings.allowed_services_list
-        if service_name and service_name not in allowed_services:
+        if service_name and service_name not in _ALLOWED_SERVICES:
             logger.warning(f"Request from unauthorized service: {service_name}")
             # For now, we'll allow it but log it
             
-        return {
-            "service": service_name or "unknown",
-            "authenticated": True,
-            "api_key_valid": True,
-        }
+        return auth_info
         
     except Exception as e:
         logger.error(f"API key validation failed: {e}")
         raise AuthenticationError(f"Authentication failed: {e}")
 
 
-async def get_api_key_auth(request: Request) -> dict:
+async def get_api_key_auth(request: Request) -> Mapping[str, Any]:
     """
     Get API key authentication from request headers.
     
@@ -57,10 +73,27 @@ async def get_api_key_auth(request: Request) -> dict:
     Raises:
         HTTPException: If authentication fails
     """
-    try:
-        # Get API key from request headers
-        api_key = request.headers.get(settings.api_key_header_name)
+    return authenticate_api_key(
+        request.headers.get(settings.api_key_header_name),
+        request.headers.get("X-Service-Name"),
+    )
+
+
+def authenticate_api_key(api_key: Optional[str], service_name: Optional[str] = None) -> Mapping[str, Any]:
+    """
+    Authenticate already-extracted API key headers.
+    
+    Args:
+        api_key: Value of the API key header, if present
+        service_name: Value of the X-Service-Name header, if present
         
+    Returns:
+        Service authentication information
+        
+    Raises:
+        HTTPException: If authentication fails
+    """
+    try:
         if not api_key:
             logger.error("Missing API key in request headers")
             raise HTTPException(
@@ -69,9 +102,6 @@ async def get_api_key_auth(request: Request) -> dict:
                 headers={"WWW-Authenticate": "ApiKey"},
             )
         
-        # Get optional service name
-        service_name = request.headers.get("X-Service-Name")
-        
         # Verify API key
         auth_info = verify_api_key(api_key, service_name)
         
@@ -101,7 +131,7 @@ async def get_api_key_auth(request: Request) -> dict:
         )
 
 # Optional authentication dependency for health checks
-async def get_api_key_auth_optional(request: Request) -> Optional[dict]:
+async def get_api_key_auth_optional(request: Request) -> Optional[Mapping[str, Any]]:
     """
     Get API key authentication from request headers (optional).
     
@@ -1,22 +1,90 @@
 """Authentication middleware for JWT and API key validation."""
 
-from typing import Optional
+import hashlib
+import time
+from typing import Dict, Optional
+import jwt
+from cachetools import TTLCache
 from fastapi import HTTPException, status, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
+from jwt import InvalidTokenError as JWTError
 from app.config.settings import settings
 from app.utils.logger import get_logger
 from app.exceptions.custom_exceptions import AuthenticationError
-from app.middleware.api_key_auth import get_api_key_auth, get_api_key_auth_optional
+from app.middleware.api_key_auth import authenticate_api_key
 
 logger = get_logger(__name__)
 security = HTTPBearer()
 
+# Raw (lower-cased, latin-1) header names consulted by hybrid authentication
+_API_KEY_HEADER = settings.api_key_header_name.lower().encode("latin-1")
+_SERVICE_NAME_HEADER = b"x-service-name"
+_AUTHORIZATION_HEADER = b"authorization"
+_REQUEST_ID_HEADER = b"x-request-id"
+_SESSION_ID_HEADER = b"x-session-id"
+_PATIENT_ID_HEADER = b"x-patient-id"
+_AUTH_HEADERS = frozenset({
+    _API_KEY_HEADER,
+    _SERVICE_NAME_HEADER,
+    _AUTHORIZATION_HEADER,
+    _REQUEST_ID_HEADER,
+    _SESSION_ID_HEADER,
+    _PATIENT_ID_HEADER,
+})
+_BEARER_PREFIX = "Bearer "
+_BEARER_PREFIX_LEN = len(_BEARER_PREFIX)
+
+# Routes that never require authentication; optional auth skips the header scan for them
+_PUBLIC_PATHS = frozenset({
+    "/",
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+    f"{settings.api_prefix}/health",
+    f"{settings.api_prefix}/health/",
+})
+
+# Verified JWT payloads keyed by a keyed hash of the token; entries are also
+# checked against the token's own "exp" claim on every hit.
+_JWT_CACHE: TTLCache = TTLCache(maxsize=4096, ttl=300)
+_JWT_CACHE_HASH_KEY = settings.jwt_secret_key.encode()[:64]
+
+# Decoder arguments bound once; audience verification is disabled for backend compatibility
+_JWT_DECODE = jwt.decode
+_JWT_SECRET = settings.jwt_secret_key
+_JWT_ALGORITHMS = [settings.jwt_algorithm]
+_JWT_OPTIONS = {"verify_aud": False}
+
+
+def _collect_auth_headers(scope) -> Dict[bytes, str]:
+    """
+    Collect authentication-related headers in a single pass over the ASGI scope.
+    
+    Args:
+        scope: ASGI connection scope
+        
+    Returns:
+        Mapping of raw header name to decoded value (first occurrence wins)
+    """
+    headers = {}
+    for key, value in scope["headers"]:
+        if key in _AUTH_HEADERS and key not in headers:
+            headers[key] = value.decode("latin-1")
+    return headers
+
+
+def _jwt_cache_key(token: str) -> bytes:
+    """Get the verification cache key for a JWT token."""
+    return hashlib.blake2b(token.encode(), digest_size=16, key=_JWT_CACHE_HASH_KEY).digest()
+
 
 def verify_jwt_token(token: str) -> dict:
     """
     Verify JWT token and return payload.
     
+    Successful verifications are cached until the token expires (or the
+    cache TTL elapses), so replayed tokens skip signature verification.
+    
     Args:
         token: JWT token string
         
@@ -26,55 +94,31 @@ def verify_jwt_token(token: str) -> dict:
     Raises:
         AuthenticationError: If token is invalid
     """
+    cache_key = _jwt_cache_key(token)
+    cached_payload = _JWT_CACHE.get(cache_key)
+    if cached_payload is not None:
+        exp = cached_payload.get("exp")
+        if exp is None or exp > time.time():
+            return dict(cached_payload)
+        _JWT_CACHE.pop(cache_key, None)
+    
     try:
-        payload = jwt.decode(
-            token,
-            settings.jwt_secret_key,
-            algorithms=[settings.jwt_algorithm],
-            options={"verify_aud": False}  # Disable audience verification for backend compatibility
-        )
+        payload = _JWT_DECODE(token, _JWT_SECRET, algorithms=_JWT_ALGORITHMS, options=_JWT_OPTIONS)
         
         # Check if token has required fields
         if not payload.get("sub"):
             raise AuthenticationError("Token missing subject")
-            
-        return payload
+        
+        _JWT_CACHE[cache_key] = payload
+        return dict(payload)
         
     except JWTError as e:
         logger.error(f"JWT token validation failed: {e}")
         raise AuthenticationError(f"Invalid token: {e}")
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> dict:
-    """
-    Get current user from JWT token.
-    
-    Args:
-        credentials: HTTP authorization credentials
-        
-    Returns:
-        User information from token payload
-        
-    Raises:
-        HTTPException: If authentication fails
-    """
-    try:
-        payload = verify_jwt_token(credentials.credentials)
-        return payload
-        
-    except AuthenticationError as e:
-        logger.error(f"Authentication failed: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=str(e),
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-
 # Hybrid authentication: API Key (preferred) or JWT (legacy)
-async def get_current_user_hybrid(request: Request) -> dict:
+async def get_current_user(request: Request) -> dict:
     """
     Get current authenticated user/service using API key (preferred) or JWT (legacy).
     
@@ -87,32 +131,31 @@ async def get_current_user_hybrid(request: Request) -> dict:
     Raises:
         HTTPException: If authentication fails
     """
+    headers = _collect_auth_headers(request.scope)
+    
     # Try API key authentication first (preferred for service-to-service)
-    api_key = request.headers.get(settings.api_key_header_name)
+    api_key = headers.get(_API_KEY_HEADER)
     if api_key:
-        try:
-            auth_info = await get_api_key_auth(request)
-            # Convert to user-like format for backward compatibility
-            return {
-                "sub": auth_info.get("service", "unknown"),
-                "service_name": auth_info.get("service"),
-                "authenticated": auth_info.get("authenticated", False),
-                "auth_type": "api_key",
-                "metadata": {
-                    "request_id": request.headers.get("X-Request-ID"),
-                    "session_id": request.headers.get("X-Session-ID"),
-                    "patient_id": request.headers.get("X-Patient-ID"),
-                    "client_ip": getattr(request.client, 'host', None) if request.client else None,
-                }
+        # If API key auth fails, don't fall back to JWT
+        auth_info = authenticate_api_key(api_key, headers.get(_SERVICE_NAME_HEADER))
+        # Convert to user-like format for backward compatibility
+        return {
+            "sub": auth_info.get("service", "unknown"),
+            "service_name": auth_info.get("service"),
+            "authenticated": auth_info.get("authenticated", False),
+            "auth_type": "api_key",
+            "metadata": {
+                "request_id": headers.get(_REQUEST_ID_HEADER),
+                "session_id": headers.get(_SESSION_ID_HEADER),
+                "patient_id": headers.get(_PATIENT_ID_HEADER),
+                "client_ip": getattr(request.client, 'host', None) if request.client else None,
             }
-        except HTTPException:
-            # If API key auth fails, don't fall back to JWT
-            raise
+        }
     
     # Fall back to JWT authentication (legacy)
-    auth_header = request.headers.get("authorization")
-    if auth_header and auth_header.startswith("Bearer "):
-        token = auth_header.split(" ")[1]
+    auth_header = headers.get(_AUTHORIZATION_HEADER)
+    if auth_header and auth_header.startswith(_BEARER_PREFIX):
+        token = auth_header[_BEARER_PREFIX_LEN:]
         try:
             payload = verify_jwt_token(token)
             payload["auth_type"] = "jwt"
@@ -133,24 +176,7 @@ async def get_current_user_hybrid(request: Request) -> dict:
     )
 
 
-# Update the main get_current_user to use hybrid authentication
-async def get_current_user_new(request: Request) -> dict:
-    """
-    Get current authenticated user/service (API key preferred, JWT fallback).
-    
-    Args:
-        request: FastAPI request object
-        
-    Returns:
-        User/service information
-        
-    Raises:
-        HTTPException: If authentication fails
-    """
-    return await get_current_user_hybrid(request)
-
-
-# Optional authentication dependency for health checks
+# Optional authentication dependency
 async def get_current_user_optional(
     request: Request
 ) -> Optional[dict]:
@@ -161,10 +187,13 @@ async def get_current_user_optional(
         request: FastAPI request object
         
     Returns:
-        User information from token payload or None
+        User information from token payload or None (always None on public paths)
     """
+    if request.scope["path"] in _PUBLIC_PATHS:
+        return None
+    
     try:
-        return await get_current_user_hybrid(request)
+        return await get_current_user(request)
     except HTTPException:
         return None
 
@@ -196,7 +225,3 @@ async def get_current_user_jwt_only(
             detail=str(e),
             headers={"WWW-Authenticate": "Bearer"},
         )
-
-
-# Alias for backward compatibility - now uses hybrid auth
-get_current_user = get_current_user_new
@@ -1,15 +1,143 @@
 """Rate limiting middleware."""
 
+import asyncio
 import time
-from typing import Optional
+from ipaddress import ip_address, ip_network
+from typing import Callable, Iterable, List, Optional, Set
+import orjson
 import redis.asyncio as redis
+from cachetools import TLRUCache
 from fastapi import Request, HTTPException, status
+from redis.exceptions import NoScriptError
+from starlette.types import ASGIApp, Receive, Scope, Send
 from app.config.settings import settings
 from app.utils.logger import get_logger
 from app.exceptions.custom_exceptions import RateLimitError
 
 logger = get_logger(__name__)
 
+# Add requests to their fixed window, setting the TTL when the window opens.
+# KEYS[1]: window key. ARGV[1]: window seconds, ARGV[2]: requests to add.
+# Returns the window count.
+FIXED_WINDOW_SCRIPT = """
+local n = redis.call('INCRBY', KEYS[1], ARGV[2])
+if n == tonumber(ARGV[2]) then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return n
+"""
+
+# Requests admitted locally before the count is flushed to Redis
+LOCAL_SYNC_EVERY = 10
+# Fraction of the limit above which every request goes to Redis
+LOCAL_SYNC_RATIO = 0.8
+# Fraction of the limit that all workers together may admit past it
+LOCAL_OVERSHOOT_RATIO = 0.1
+# Seconds before a window closes at which local counts are flushed to Redis
+LOCAL_FLUSH_MARGIN = 2.0
+# Seconds to wait before reconnecting after a failed Redis connection attempt
+INIT_RETRY_SECONDS = 5.0
+
+
+# Shared connection pool, created once at startup
+redis_pool: Optional[redis.ConnectionPool] = None
+
+
+def get_redis_pool() -> redis.ConnectionPool:
+    """Get the shared Redis connection pool, creating it on first use."""
+    global redis_pool
+    if redis_pool is None:
+        redis_pool = redis.ConnectionPool.from_url(
+            settings.redis_url,
+            max_connections=settings.redis_max_connections,
+            decode_responses=False,
+        )
+    return redis_pool
+
+
+def local_admission_budget(requests_limit: int, workers: int) -> int:
+    """
+    Get how many requests a worker may admit locally between Redis syncs.
+    
+    Each worker can admit its budget against a stale Redis count once, so a
+    client can exceed the limit by at most workers * budget requests per
+    window. The budget is sized to keep that within LOCAL_OVERSHOOT_RATIO of
+    the limit; small limits get no local admission at all.
+    
+    Args:
+        requests_limit: Requests allowed per window
+        workers: Number of worker processes sharing the Redis counters
+        
+    Returns:
+        Requests admitted locally before the next sync
+    """
+    return min(LOCAL_SYNC_EVERY - 1, int(requests_limit * LOCAL_OVERSHOOT_RATIO) // workers)
+
+
+class _LocalCounts(TLRUCache):
+    """TLRUCache that hands every expired or evicted entry to a callback."""
+    
+    def __init__(self, maxsize: int, ttu: Callable, on_drop: Callable[[bytes, List[int]], None]):
+        """
+        Initialize the cache.
+        
+        Args:
+            maxsize: Maximum number of entries
+            ttu: Function of (key, entry, now) giving the wall-clock expiry time
+            on_drop: Called with each entry that expires or is evicted
+        """
+        super().__init__(maxsize=maxsize, ttu=ttu, timer=time.time)
+        self._on_drop = on_drop
+    
+    def expire(self, now=None):
+        """Remove expired entries, passing each to on_drop."""
+        expired = super().expire(now)
+        for key, entry in expired:
+            self._on_drop(key, entry)
+        return expired
+    
+    def popitem(self):
+        """Evict the least recently used entry, passing it to on_drop."""
+        key, entry = super().popitem()
+        self._on_drop(key, entry)
+        return key, entry
+
+
+def _client_identifier(request: Request) -> str:
+    """Get the client identifier resolved by ClientIdentifierMiddleware."""
+    identifier = request.scope.get("state", {}).get("rl_identifier")
+    return identifier if identifier is not None else request.client.host
+
+
+class ClientIdentifierMiddleware:
+    """ASGI middleware that resolves the rate limit client identifier once per request."""
+    
+    def __init__(self, app: ASGIApp, trust_forwarded_for: bool = False):
+        """
+        Initialize the middleware.
+        
+        Args:
+            app: Wrapped ASGI application
+            trust_forwarded_for: Use X-Forwarded-For; only safe behind a proxy that sets it
+        """
+        self.app = app
+        self.trust_forwarded_for = trust_forwarded_for
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            identifier = None
+            if self.trust_forwarded_for:
+                for name, value in scope["headers"]:
+                    if name == b"x-forwarded-for":
+                        # The proxy appends the peer address, so only the last hop is trustworthy
+                        identifier = value.rsplit(b",", 1)[-1].strip().decode("latin-1") or None
+                        break
+            if identifier is None:
+                client = scope.get("client")
+                identifier = client[0] if client else "unknown"
+            scope.setdefault("state", {})["rl_identifier"] = identifier
+        await self.app(scope, receive, send)
+
 
 class RateLimiter:
     """Redis-based rate limiter."""
@@ -17,19 +145,58 @@ class RateLimiter:
     def __init__(self):
         """Initialize rate limiter."""
         self.redis_client: Optional[redis.Redis] = None
+        self._script_sha: Optional[str] = None
+        self._init_lock = asyncio.Lock()
+        self._init_retry_at = 0.0
         self.requests_limit = settings.rate_limit_requests
         self.window_seconds = settings.rate_limit_window
+        self.enabled = settings.enable_rate_limiting
+        # Built once so the throttled path allocates nothing extra
+        self.limit_message = (
+            f"Rate limit exceeded. Maximum {self.requests_limit} requests per {self.window_seconds} seconds"
+        )
+        self.retry_after_headers = {"Retry-After": str(self.window_seconds)}
+        self._exempt_networks = tuple(
+            ip_network(net, strict=False) for net in settings.rate_limit_exempt_networks_list
+        )
+        # Keys are built as bytes so redis-py sends them without re-encoding
+        self._key_prefix = b"rl:"
+        # window key -> [count last seen in Redis, requests admitted locally since].
+        # Entries expire just before their window closes; pending counts of expired
+        # and evicted entries are flushed so every admitted request is charged.
+        self._local_counts = _LocalCounts(
+            maxsize=10_000, ttu=self._flush_deadline, on_drop=self._schedule_flush
+        )
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self._sync_threshold = int(self.requests_limit * LOCAL_SYNC_RATIO)
+        self._local_budget = local_admission_budget(self.requests_limit, settings.workers)
     
     async def init_redis(self):
-        """Initialize Redis connection."""
-        if not self.redis_client:
+        """Initialize Redis connection; concurrent callers share a single attempt."""
+        if self.redis_client:
+            return
+        async with self._init_lock:
+            # Another caller may have connected, or just failed, while we waited
+            if self.redis_client or time.monotonic() < self._init_retry_at:
+                return
             try:
-                self.redis_client = redis.from_url(settings.redis_url)
-                await self.redis_client.ping()
+                client = redis.Redis(connection_pool=get_redis_pool())
+                # SCRIPT LOAD doubles as the connectivity check, saving a PING round trip
+                self._script_sha = await client.script_load(FIXED_WINDOW_SCRIPT)
+                # Published only once the script is loaded, so callers never see a half-ready client
+                self.redis_client = client
                 logger.info("Redis connection established for rate limiting")
             except Exception as e:
                 logger.error(f"Failed to connect to Redis: {e}")
-                self.redis_client = None
+                self._init_retry_at = time.monotonic() + INIT_RETRY_SECONDS
+    
+    async def close(self):
+        """Release the client and disconnect the shared pool."""
+        global redis_pool
+        self.redis_client = None
+        if redis_pool is not None:
+            await redis_pool.disconnect()
+            redis_pool = None
     
     async def check_rate_limit(self, request: Request, user_id: str = None) -> bool:
         """
@@ -45,6 +212,12 @@ class RateLimiter:
         Raises:
             RateLimitError: If rate limit exceeded
         """
+        client_id = _client_identifier(request)
+        
+        # Disabled or trusted callers never cost a Redis round trip
+        if not self.enabled or self._is_exempt(client_id):
+            return True
+        
         if not self.redis_client:
             await self.init_redis()
             
@@ -53,31 +226,37 @@ class RateLimiter:
             logger.warning("Redis unavailable, skipping rate limiting")
             return True
         
-        # Create rate limit key
-        identifier = user_id or request.client.host
-        key = f"rate_limit:{identifier}"
+        identifier = user_id or client_id
+        now = time.time()
+        key = self._window_key(identifier, int(now))
+        
+        # Flushes the pending counts of windows about to close
+        self._local_counts.expire(now)
+        
+        # Well under the limit: admit locally and flush the count to Redis later.
+        # Redis stays authoritative for every deny decision.
+        if now < self._flush_deadline(key, None, now):
+            entry = self._local_counts.get(key)
+            if entry is None:
+                entry = self._local_counts[key] = [0, 0]
+            if entry[0] + entry[1] < self._sync_threshold and entry[1] < self._local_budget:
+                entry[1] += 1
+                return True
+            increment = entry[1] + 1
+            entry[1] = 0
+        else:
+            # Closing seconds of the window: count every request in Redis directly
+            entry = None
+            increment = 1
         
         try:
-            current_time = int(time.time())
-            window_start = current_time - self.window_seconds
+            current_requests = await self._incr_window(key, increment)
+            if entry is not None:
+                entry[0] = max(entry[0], current_requests)
             
-            # Remove old entries
-            await self.redis_client.zremrangebyscore(key, 0, window_start)
-            
-            # Count current requests
-            current_requests = await self.redis_client.zcard(key)
-            
-            if current_requests >= self.requests_limit:
+            if current_requests > self.requests_limit:
                 logger.warning(f"Rate limit exceeded for {identifier}")
-                raise RateLimitError(
-                    f"Rate limit exceeded. Maximum {self.requests_limit} requests per {self.window_seconds} seconds"
-                )
-            
-            # Add current request
-            await self.redis_client.zadd(key, {str(current_time): current_time})
-            
-            # Set expiration
-            await self.redis_client.expire(key, self.window_seconds)
+                raise RateLimitError(self.limit_message)
             
             return True
             
@@ -88,6 +267,78 @@ class RateLimiter:
             # If rate limiting fails, allow the request
             return True
     
+    def _flush_deadline(self, key: bytes, entry: Optional[List[int]], now: float) -> float:
+        """Get the time by which local counts for the current window must be flushed."""
+        return (now // self.window_seconds + 1) * self.window_seconds - LOCAL_FLUSH_MARGIN
+    
+    def _schedule_flush(self, key: bytes, entry: List[int]) -> None:
+        """Charge a dropped local entry's pending requests to its Redis window."""
+        if entry[1] and self.redis_client is not None:
+            task = asyncio.get_running_loop().create_task(self._flush(key, entry[1]))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+    
+    async def _flush(self, key: bytes, increment: int) -> None:
+        """Add locally admitted requests to a window counter."""
+        try:
+            await self._incr_window(key, increment)
+        except Exception as e:
+            logger.error(f"Failed to flush local rate limit count: {e}")
+    
+    def _is_exempt(self, host: str) -> bool:
+        """
+        Check whether a client address is in an exempt network.
+        
+        Args:
+            host: Client IP address
+            
+        Returns:
+            True if the address is exempt from rate limiting
+        """
+        if not self._exempt_networks:
+            return False
+        try:
+            address = ip_address(host)
+        except ValueError:
+            return False
+        return any(address in network for network in self._exempt_networks)
+    
+    def _window_key(self, identifier: str, current_time: int) -> bytes:
+        """
+        Build the counter key for the window containing current_time.
+        
+        The identifier is wrapped in a Redis Cluster hash tag ({...}) so every
+        key for the same client maps to one slot and can be used together in a
+        single script.
+        
+        Args:
+            identifier: User ID or client IP
+            current_time: Current time in seconds
+            
+        Returns:
+            Time-bucketed rate limit key
+        """
+        return b"%s{%s}:%d" % (self._key_prefix, identifier.encode(), current_time // self.window_seconds)
+    
+    async def _incr_window(self, key: bytes, increment: int = 1) -> int:
+        """
+        Increment the window counter in a single round trip.
+        
+        Args:
+            key: Time-bucketed rate limit key
+            increment: Number of requests to add
+            
+        Returns:
+            Number of requests counted in the window, including these
+        """
+        args = (key, self.window_seconds, increment)
+        try:
+            return await self.redis_client.evalsha(self._script_sha, 1, *args)
+        except NoScriptError:
+            # Script cache was flushed (e.g. Redis restart); reload and retry once
+            self._script_sha = await self.redis_client.script_load(FIXED_WINDOW_SCRIPT)
+            return await self.redis_client.evalsha(self._script_sha, 1, *args)
+    
     async def get_rate_limit_info(self, request: Request, user_id: str = None) -> dict:
         """
         Get rate limit information for a user/IP.
@@ -110,25 +361,18 @@ class RateLimiter:
                 "reset_time": int(time.time()) + self.window_seconds
             }
         
-        identifier = user_id or request.client.host
-        key = f"rate_limit:{identifier}"
+        identifier = user_id or _client_identifier(request)
         
         try:
             current_time = int(time.time())
-            window_start = current_time - self.window_seconds
-            
-            # Remove old entries
-            await self.redis_client.zremrangebyscore(key, 0, window_start)
-            
-            # Count current requests
-            current_requests = await self.redis_client.zcard(key)
+            current_requests = int(await self.redis_client.get(self._window_key(identifier, current_time)) or 0)
             remaining = max(0, self.requests_limit - current_requests)
             
             return {
                 "limit": self.requests_limit,
                 "window": self.window_seconds,
                 "remaining": remaining,
-                "reset_time": current_time + self.window_seconds
+                "reset_time": (current_time // self.window_seconds + 1) * self.window_seconds
             }
             
         except Exception as e:
@@ -164,5 +408,38 @@ async def check_rate_limit_dependency(request: Request, user: dict = None):
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail=str(e),
-            headers={"Retry-After": str(settings.rate_limit_window)}
+            headers=rate_limiter.retry_after_headers
         )
+
+
+class RateLimitMiddleware:
+    """ASGI middleware that rejects over-limit requests before routing and body parsing."""
+    
+    def __init__(self, app: ASGIApp, paths: Iterable[str]):
+        """
+        Initialize the middleware.
+        
+        Args:
+            app: Wrapped ASGI application
+            paths: Exact request paths whose POST requests are rate limited
+        """
+        self.app = app
+        self.paths = frozenset(paths)
+        # Same body and headers the HTTPException-based dependency produced, built once
+        self._body = orjson.dumps({"detail": rate_limiter.limit_message})
+        self._headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self._body)).encode("latin-1")),
+            (b"retry-after", str(rate_limiter.window_seconds).encode("latin-1")),
+        ]
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope["method"] == "POST" and scope["path"] in self.paths:
+            try:
+                await rate_limiter.check_rate_limit(Request(scope))
+            except RateLimitError as e:
+                logger.warning(f"Rate limit exceeded: {e}")
+                await send({"type": "http.response.start", "status": 429, "headers": self._headers})
+                await send({"type": "http.response.body", "body": self._body})
+                return
+        await self.app(scope, receive, send)
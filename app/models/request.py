@@ -1,10 +1,14 @@
 """Request models for the AI diagnosis API."""
 
-from typing import List, Optional
-from pydantic import BaseModel, Field, validator
+from typing import Annotated, Optional
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, conlist, field_validator
 from enum import Enum
 
 
+# Normalized symptom text; stripping, lowercasing and bounds all run in pydantic-core
+SymptomStr = Annotated[str, StringConstraints(strip_whitespace=True, to_lower=True, min_length=2, max_length=100)]
+
+
 class SeverityLevel(str, Enum):
     """Severity levels for symptoms."""
     MILD = "mild"
@@ -30,12 +34,10 @@ class ProgressionType(str, Enum):
 class DiagnosisRequest(BaseModel):
     """Request model for diagnosis endpoint."""
     
-    symptoms: List[str] = Field(
+    symptoms: conlist(SymptomStr, min_length=1, max_length=3) = Field(
         ...,
         description="List of symptoms reported by the patient",
-        min_items=1,
-        max_items=3,
-        example=["vaginal discharge", "itching", "burning sensation"]
+        examples=[["vaginal discharge", "itching", "burning sensation"]]
     )
     
     patient_age: int = Field(
@@ -43,7 +45,7 @@ class DiagnosisRequest(BaseModel):
         description="Patient's age in years",
         ge=12,
         le=100,
-        example=25
+        examples=[25]
     )
     
     severity_level: SeverityLevel = Field(
@@ -55,44 +57,23 @@ class DiagnosisRequest(BaseModel):
         ...,
         description="Duration of symptoms",
         max_length=50,
-        example="3 days"
+        examples=["3 days"]
     )
     
     onset: Optional[OnsetType] = Field(
         None,
         description="Onset type of symptoms",
-        example="sudden"
+        examples=["sudden"]
     )
     
     progression: Optional[ProgressionType] = Field(
         None,
         description="Progression of symptoms over time",
-        example="stable"
+        examples=["stable"]
     )
 
-    @validator("symptoms")
-    def validate_symptoms(cls, v):
-        """Validate symptoms list."""
-        if not v:
-            raise ValueError("At least one symptom is required")
-        
-        # Clean and validate each symptom
-        cleaned_symptoms = []
-        for symptom in v:
-            if not isinstance(symptom, str):
-                raise ValueError("Each symptom must be a string")
-            
-            cleaned_symptom = symptom.strip().lower()
-            if len(cleaned_symptom) < 2:
-                raise ValueError("Each symptom must be at least 2 characters long")
-            if len(cleaned_symptom) > 100:
-                raise ValueError("Each symptom must be less than 100 characters")
-            
-            cleaned_symptoms.append(cleaned_symptom)
-        
-        return cleaned_symptoms
-
-    @validator("duration")
+    @field_validator("duration")
+    @classmethod
     def validate_duration(cls, v):
         """Validate duration format."""
         if not v or not v.strip():
@@ -104,9 +85,8 @@ class DiagnosisRequest(BaseModel):
         
         return duration
 
-    class Config:
-        """Pydantic configuration."""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "symptoms": ["vaginal discharge", "itching", "burning sensation"],
                 "patient_age": 25,
@@ -116,19 +96,19 @@ class DiagnosisRequest(BaseModel):
                 "progression": "stable"
             }
         }
+    )
+
+
+class DiagnosisBody(BaseModel):
+    """Request body for the diagnosis endpoint."""
+    
+    diagnosis_request: DiagnosisRequest
 
 
 class SymptomValidationRequest(BaseModel):
     """Request model for symptom validation."""
     
-    symptoms: List[str] = Field(
+    symptoms: conlist(SymptomStr, min_length=1, max_length=20) = Field(
         ...,
-        description="List of symptoms to validate",
-        min_items=1,
-        max_items=20
+        description="List of symptoms to validate"
     )
-
-    @validator("symptoms")
-    def validate_symptoms(cls, v):
-        """Validate symptoms list."""
-        return DiagnosisRequest.validate_symptoms(v)
@@ -1,8 +1,13 @@
 """Response models for the AI diagnosis API."""
 
 from typing import List, Optional
-from pydantic import BaseModel, Field
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import datetime, timezone
+
+
+def utc_now() -> datetime:
+    """Get the current time as an aware UTC datetime."""
+    return datetime.now(timezone.utc)
 
 
 class Medication(BaseModel):
@@ -15,9 +20,8 @@ class Medication(BaseModel):
     reason: str = Field(..., description="Reason for prescribing this medication")
     notes: Optional[str] = Field(None, description="Additional notes")
 
-    class Config:
-        """Pydantic configuration."""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "name": "Fluconazole",
                 "dosage": "150mg",
@@ -27,6 +31,7 @@ class Medication(BaseModel):
                 "notes": "Take with food"
             }
         }
+    )
 
 
 class Investigation(BaseModel):
@@ -36,15 +41,15 @@ class Investigation(BaseModel):
     priority: str = Field(..., description="Priority level (low, medium, high)")
     reason: str = Field(..., description="Reason for investigation")
 
-    class Config:
-        """Pydantic configuration."""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "name": "Vaginal swab culture",
                 "priority": "medium",
                 "reason": "To identify specific pathogen"
             }
         }
+    )
 
 
 class PossibleDiagnosis(BaseModel):
@@ -59,15 +64,15 @@ class PossibleDiagnosis(BaseModel):
     )
     description: Optional[str] = Field(None, description="Brief diagnosis description")
 
-    class Config:
-        """Pydantic configuration."""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "name": "Vaginal Candidiasis",
                 "confidence_score": 0.85,
                 "description": "Fungal infection of the vagina"
             }
         }
+    )
 
 
 class ConciseDiagnosisResponse(BaseModel):
@@ -76,8 +81,8 @@ class ConciseDiagnosisResponse(BaseModel):
     possible_diagnoses: List[PossibleDiagnosis] = Field(
         ...,
         description="List of 1-2 most probable diagnoses with confidence scores",
-        min_items=1,
-        max_items=2
+        min_length=1,
+        max_length=2
     )
     
     suggested_investigations: List[Investigation] = Field(
@@ -91,13 +96,12 @@ class ConciseDiagnosisResponse(BaseModel):
     )
     
     timestamp: datetime = Field(
-        default_factory=datetime.utcnow,
+        default_factory=utc_now,
         description="Response timestamp"
     )
 
-    class Config:
-        """Pydantic configuration."""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "possible_diagnoses": [
                     {
@@ -127,6 +131,7 @@ class ConciseDiagnosisResponse(BaseModel):
                 "timestamp": "2023-11-15T10:30:00Z"
             }
         }
+    )
 
 
 class DiagnosisResponse(BaseModel):
@@ -167,13 +172,12 @@ class DiagnosisResponse(BaseModel):
     )
     
     timestamp: datetime = Field(
-        default_factory=datetime.utcnow,
+        default_factory=utc_now,
         description="Response timestamp"
     )
 
-    class Config:
-        """Pydantic configuration."""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "diagnosis": "Vaginal Candidiasis (Yeast Infection)",
                 "confidence_score": 0.85,
@@ -204,6 +208,7 @@ class DiagnosisResponse(BaseModel):
                 "timestamp": "2023-11-15T10:30:00Z"
             }
         }
+    )
 
 
 class SymptomValidationResponse(BaseModel):
@@ -224,22 +229,22 @@ class SymptomValidationResponse(BaseModel):
         description="Suggested corrections for invalid symptoms"
     )
 
-    class Config:
-        """Pydantic configuration."""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "valid_symptoms": ["vaginal discharge", "itching"],
                 "invalid_symptoms": ["xyz symptom"],
                 "suggestions": ["vaginal burning", "pelvic pain"]
             }
         }
+    )
 
 
 class HealthCheckResponse(BaseModel):
     """Response model for health check endpoint."""
     
     status: str = Field(..., description="Service status")
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=utc_now)
     version: str = Field(..., description="API version")
     
     services: dict = Field(
@@ -247,9 +252,8 @@ class HealthCheckResponse(BaseModel):
         description="External service status"
     )
 
-    class Config:
-        """Pydantic configuration."""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "status": "healthy",
                 "timestamp": "2023-11-15T10:30:00Z",
@@ -260,6 +264,7 @@ class HealthCheckResponse(BaseModel):
                 }
             }
         }
+    )
 
 
 class ErrorResponse(BaseModel):
@@ -267,14 +272,14 @@ class ErrorResponse(BaseModel):
     
     error: str = Field(..., description="Error message")
     detail: Optional[str] = Field(None, description="Error details")
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=utc_now)
 
-    class Config:
-        """Pydantic configuration."""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "error": "Invalid input",
                 "detail": "Symptoms list cannot be empty",
                 "timestamp": "2023-11-15T10:30:00Z"
             }
         }
+    )
@@ -1,23 +1,28 @@
 """Simplified structured request models matching the new schema specification."""
 
-from typing import List, Dict, Any, Union
-from pydantic import BaseModel, Field
-from enum import Enum
+from typing import List, Dict, Any, Literal, Union
+from pydantic import BaseModel, ConfigDict, Field
 
 
-class SeverityLevel(str, Enum):
-    MILD = "mild"
-    MODERATE = "moderate"
-    SEVERE = "severe"
+# Validated as a plain string membership check, with no Enum member construction
+SeverityLevel = Literal["mild", "moderate", "severe"]
+
+# Shared by the nested sections: immutable once parsed and whitespace stripped.
+# Unknown keys are still ignored so older clients sending extra fields keep working.
+_SECTION_CONFIG = ConfigDict(frozen=True, str_strip_whitespace=True)
 
 
 class PatientProfile(BaseModel):
+    model_config = _SECTION_CONFIG
+
     age: int = Field(..., description="Patient's age", ge=10, le=100)
     request_id: str = Field(..., description="Unique request identifier")
     timestamp: str = Field(..., description="Request timestamp in ISO format")
 
 
 class PrimaryComplaint(BaseModel):
+    model_config = _SECTION_CONFIG
+
     main_symptom: str = Field(..., description="Primary symptom")
     duration: str = Field(..., description="Duration of symptoms")
     severity: SeverityLevel = Field(..., description="Severity level")
@@ -26,50 +31,68 @@ class PrimaryComplaint(BaseModel):
 
 
 class SymptomSpecificDetails(BaseModel):
+    model_config = _SECTION_CONFIG
+
     symptom_characteristics: Dict[str, Union[str, int, bool, list, dict, None]] = Field(
         ..., description="Flexible symptom characteristics"
     )
 
 
 class PregnancyStatus(BaseModel):
+    model_config = _SECTION_CONFIG
+
     could_be_pregnant: bool = Field(..., description="Possibility of pregnancy")
     pregnancy_test_result: str = Field(..., description="Pregnancy test result")
 
 
 class SexualActivity(BaseModel):
+    model_config = _SECTION_CONFIG
+
     sexually_active: bool = Field(..., description="Sexual activity status")
     contraception_method: str = Field(..., description="Contraception method used")
 
 
 class MenstrualHistory(BaseModel):
+    model_config = _SECTION_CONFIG
+
     menarche_age: int = Field(..., description="Age at menarche", ge=8, le=20)
     cycle_frequency: int = Field(..., description="Cycle frequency in days")
     period_duration: int = Field(..., description="Period duration in days")
 
 
 class ReproductiveHistory(BaseModel):
+    model_config = _SECTION_CONFIG
+
     pregnancy_status: PregnancyStatus = Field(..., description="Pregnancy status details")
     sexual_activity: SexualActivity = Field(..., description="Sexual activity details")
     menstrual_history: MenstrualHistory = Field(..., description="Menstrual history")
 
 
 class PainSymptoms(BaseModel):
+    model_config = _SECTION_CONFIG
+
     pelvic_pain: str = Field(default="", description="Pelvic pain severity")
     vulvar_irritation: str = Field(default="", description="Vulvar irritation severity")
 
 
 class SystemicSymptoms(BaseModel):
+    model_config = _SECTION_CONFIG
+
     fatigue: str = Field(default="", description="Fatigue level")
     nausea: bool = Field(default=False, description="Nausea presence")
     fever: bool = Field(default=False, description="Fever presence")
 
 
 class AssociatedSymptoms(BaseModel):
+    model_config = _SECTION_CONFIG
+
     pain: PainSymptoms = Field(..., description="Pain-related symptoms")
     systemic: SystemicSymptoms = Field(..., description="Systemic symptoms")
 
 
 class MedicalContext(BaseModel):
+    model_config = _SECTION_CONFIG
+
     current_medications: List[str] = Field(..., description="Current medications")
     recent_medications: List[str] = Field(..., description="Recent medications")
     medical_conditions: List[str] = Field(..., description="Medical conditions")
@@ -79,6 +102,8 @@ class MedicalContext(BaseModel):
 
 
 class HealthcareInteraction(BaseModel):
+    model_config = _SECTION_CONFIG
+
     previous_consultation: bool = Field(..., description="Previous consultation status")
     consultation_outcome: str = Field(..., description="Previous consultation outcome")
     investigations_done: bool = Field(..., description="Investigations done status")
@@ -86,6 +111,8 @@ class HealthcareInteraction(BaseModel):
 
 
 class PatientConcerns(BaseModel):
+    model_config = _SECTION_CONFIG
+
     main_worry: str = Field(..., description="Patient's main worry")
     impact_on_life: str = Field(..., description="Impact on patient's life")
     additional_notes: str = Field(..., description="Additional notes from patient")
@@ -103,8 +130,8 @@ class SimplifiedStructuredDiagnosisRequest(BaseModel):
     healthcare_interaction: HealthcareInteraction = Field(..., description="Healthcare interaction history")
     patient_concerns: PatientConcerns = Field(..., description="Patient concerns and notes")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "patient_profile": {
                     "age": 25,
@@ -173,3 +200,10 @@ class SimplifiedStructuredDiagnosisRequest(BaseModel):
                 }
             }
         }
+    )
+
+
+class StructuredDiagnosisBody(BaseModel):
+    """Request body for the structured diagnosis endpoint."""
+    
+    structured_request: SimplifiedStructuredDiagnosisRequest
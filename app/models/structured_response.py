@@ -1,39 +1,52 @@
 """Structured response models for advanced AI diagnosis output."""
 
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any, Tuple
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
-from .response import Medication, Investigation, PossibleDiagnosis
+from .response import Medication, Investigation, PossibleDiagnosis, utc_now
+
+# Sections are never modified after the response is assembled. For the same reason
+# optional collections are tuples defaulting to the shared empty tuple, so absent
+# fields cost no allocation; they serialize as JSON arrays just like lists.
+_SECTION_CONFIG = ConfigDict(frozen=True)
 
 class AllergyConsideration(BaseModel):
     """Model for allergy considerations in treatment."""
     
-    allergic_medications: List[str] = Field(default_factory=list, description="Medications patient is allergic to")
-    safe_alternatives: List[str] = Field(default_factory=list, description="Safe alternative medications")
-    contraindicated_drugs: List[str] = Field(default_factory=list, description="Drugs to avoid")
+    model_config = _SECTION_CONFIG
+    
+    allergic_medications: Tuple[str, ...] = Field(default=(), description="Medications patient is allergic to")
+    safe_alternatives: Tuple[str, ...] = Field(default=(), description="Safe alternative medications")
+    contraindicated_drugs: Tuple[str, ...] = Field(default=(), description="Drugs to avoid")
 
 class SafetyAssessment(BaseModel):
     """Model for safety assessment based on patient allergies and conditions."""
     
+    model_config = _SECTION_CONFIG
+    
     allergy_considerations: AllergyConsideration = Field(..., description="Allergy-related safety considerations")
-    condition_interactions: List[str] = Field(default_factory=list, description="Interactions with existing conditions")
-    safety_warnings: List[str] = Field(default_factory=list, description="Important safety warnings")
+    condition_interactions: Tuple[str, ...] = Field(default=(), description="Interactions with existing conditions")
+    safety_warnings: Tuple[str, ...] = Field(default=(), description="Important safety warnings")
 
 class TreatmentRecommendation(BaseModel):
     """Model for comprehensive treatment recommendations."""
     
+    model_config = _SECTION_CONFIG
+    
     primary_treatment: Optional[str] = Field(None, description="Primary recommended treatment")
-    safe_medications: List[Medication] = Field(default_factory=list, description="Safe medications considering allergies")
-    lifestyle_modifications: List[str] = Field(default_factory=list, description="Lifestyle modification recommendations")
-    dietary_advice: List[str] = Field(default_factory=list, description="Dietary recommendations")
+    safe_medications: Tuple[Medication, ...] = Field(default=(), description="Safe medications considering allergies")
+    lifestyle_modifications: Tuple[str, ...] = Field(default=(), description="Lifestyle modification recommendations")
+    dietary_advice: Tuple[str, ...] = Field(default=(), description="Dietary recommendations")
     follow_up_timeline: str = Field(..., description="Recommended follow-up timeline")
 
 class RiskAssessment(BaseModel):
     """Model for risk assessment."""
     
+    model_config = _SECTION_CONFIG
+    
     urgency_level: str = Field(..., description="Urgency level (low, moderate, high, urgent)")
-    red_flags: List[str] = Field(default_factory=list, description="Red flag symptoms to watch for")
-    when_to_seek_emergency_care: List[str] = Field(default_factory=list, description="When to seek emergency care")
+    red_flags: Tuple[str, ...] = Field(default=(), description="Red flag symptoms to watch for")
+    when_to_seek_emergency_care: Tuple[str, ...] = Field(default=(), description="When to seek emergency care")
 
 class StructuredDiagnosisResponse(BaseModel):
     """Comprehensive response model for structured diagnosis endpoint."""
@@ -47,21 +60,21 @@ class StructuredDiagnosisResponse(BaseModel):
     possible_diagnoses: List[PossibleDiagnosis] = Field(
         ...,
         description="List of possible diagnoses with confidence scores",
-        min_items=1,
-        max_items=3
+        min_length=1,
+        max_length=3
     )
     
     # Clinical assessment
     clinical_reasoning: str = Field(..., description="Clinical reasoning behind the diagnosis")
-    differential_considerations: List[str] = Field(default_factory=list, description="Differential diagnosis considerations")
+    differential_considerations: Tuple[str, ...] = Field(default=(), description="Differential diagnosis considerations")
     
     # Safety and risk assessment
     safety_assessment: SafetyAssessment = Field(..., description="Safety assessment based on allergies and conditions")
     risk_assessment: RiskAssessment = Field(..., description="Risk and urgency assessment")
     
     # Investigations and tests
-    recommended_investigations: List[Investigation] = Field(
-        default_factory=list,
+    recommended_investigations: Tuple[Investigation, ...] = Field(
+        default=(),
         description="Recommended investigations and tests"
     )
     
@@ -69,8 +82,8 @@ class StructuredDiagnosisResponse(BaseModel):
     treatment_recommendations: TreatmentRecommendation = Field(..., description="Comprehensive treatment recommendations")
     
     # Patient education
-    patient_education: List[str] = Field(default_factory=list, description="Patient education points")
-    warning_signs: List[str] = Field(default_factory=list, description="Warning signs to watch for")
+    patient_education: Tuple[str, ...] = Field(default=(), description="Patient education points")
+    warning_signs: Tuple[str, ...] = Field(default=(), description="Warning signs to watch for")
     
     # Metadata
     confidence_score: float = Field(
@@ -80,14 +93,13 @@ class StructuredDiagnosisResponse(BaseModel):
         le=1.0
     )
     
-    processing_notes: List[str] = Field(default_factory=list, description="Processing notes and considerations")
+    processing_notes: Tuple[str, ...] = Field(default=(), description="Processing notes and considerations")
     
     disclaimer: str = Field(..., description="Medical disclaimer")
-    timestamp: datetime = Field(default_factory=datetime.utcnow, description="Response timestamp")
+    timestamp: datetime = Field(default_factory=utc_now, description="Response timestamp")
     
-    class Config:
-        """Pydantic configuration."""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "request_id": "req_allergy_002",
                 "patient_age": 29,
@@ -177,3 +189,4 @@ class StructuredDiagnosisResponse(BaseModel):
                 "timestamp": "2025-07-19T05:06:30Z"
             }
         }
+    )
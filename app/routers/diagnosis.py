@@ -1,40 +1,118 @@
 """Diagnosis router with endpoints for AI diagnosis."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import logging
+import time
+from typing import Any, AsyncIterator, Dict
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
 from app.models import (
-    DiagnosisRequest, 
     DiagnosisResponse, 
     ErrorResponse, 
     StructuredDiagnosisResponse,
     PossibleDiagnosis,
     Investigation
 )
+from app.models.request import DiagnosisBody
 from app.models.response import Medication
-from app.models.simplified_structured_request import SimplifiedStructuredDiagnosisRequest
+from app.models.simplified_structured_request import SimplifiedStructuredDiagnosisRequest, StructuredDiagnosisBody
 from app.models.structured_response import (
     SafetyAssessment, 
     AllergyConsideration,
     RiskAssessment,
     TreatmentRecommendation
 )
+from app.services.batcher import structured_diagnosis_batcher
+from app.services.diagnosis_cache import coalesce_inflight, diagnosis_cache, diagnosis_cache_key
 from app.services.diagnosis_service import diagnosis_service
+from app.services.openai_service import openai_service
 from app.middleware.auth import get_current_user
-from app.middleware.rate_limiter import check_rate_limit_dependency
 from app.utils.logger import get_logger
+from app.utils.request_body import json_body_openapi, parse_json_body
 from app.exceptions.custom_exceptions import (
     DiagnosisServiceError,
+    OpenAIResponseParseError,
     OpenAIServiceError
 )
-from app.services.openai_service import openai_service
 from app.config.settings import settings
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/diagnosis", tags=["diagnosis"])
 
+# Shared default for missing sections of the model output; only ever read
+_EMPTY: dict = {}
+
+# Settings are frozen, so the disclaimer is bound once
+_MEDICAL_DISCLAIMER = settings.medical_disclaimer
+
+
+def _json_response(model: BaseModel) -> Response:
+    """
+    Serialize an already-validated response model straight to JSON bytes.
+    
+    Returning a Response skips FastAPI's response_model revalidation and
+    jsonable_encoder pass. Optional fields the model left empty are omitted
+    rather than sent as null.
+    
+    Args:
+        model: Validated response model
+        
+    Returns:
+        JSON response carrying the serialized model
+    """
+    return Response(content=model.model_dump_json(exclude_none=True), media_type="application/json")
+
+
+def _build_structured_response(
+    structured_request: SimplifiedStructuredDiagnosisRequest,
+    diagnosis_data: Dict[str, Any],
+) -> StructuredDiagnosisResponse:
+    """
+    Build the structured diagnosis response from OpenAI diagnosis data.
+    
+    Args:
+        structured_request: Validated structured request
+        diagnosis_data: Diagnosis data parsed from the model output
+        
+    Returns:
+        Validated structured diagnosis response
+        
+    Raises:
+        ValidationError: If the model output does not fit the response schema
+    """
+    # The model output is untrusted, so it is validated, but in a single
+    # pydantic-core pass over the whole tree rather than one Python
+    # constructor call per nested section.
+    patient_profile = structured_request.patient_profile
+    safety_data = diagnosis_data.get("safety_assessment", _EMPTY)
+    return StructuredDiagnosisResponse.model_validate({
+        "request_id": patient_profile.request_id,
+        "patient_age": patient_profile.age,
+        "primary_symptom": structured_request.primary_complaint.main_symptom,
+        "possible_diagnoses": diagnosis_data.get("possible_diagnoses", ()),
+        "clinical_reasoning": diagnosis_data.get("clinical_reasoning", ""),
+        "differential_considerations": diagnosis_data.get("differential_considerations", ()),
+        "safety_assessment": {
+            "allergy_considerations": safety_data.get("allergy_considerations", _EMPTY),
+            "condition_interactions": safety_data.get("condition_interactions", ()),
+            "safety_warnings": safety_data.get("safety_warnings", ()),
+        },
+        "risk_assessment": diagnosis_data.get("risk_assessment", _EMPTY),
+        "recommended_investigations": diagnosis_data.get("recommended_investigations", ()),
+        "treatment_recommendations": diagnosis_data.get("treatment_recommendations", _EMPTY),
+        "patient_education": diagnosis_data.get("patient_education", ()),
+        "warning_signs": diagnosis_data.get("warning_signs", ()),
+        "confidence_score": diagnosis_data.get("confidence_score", 0.0),
+        "processing_notes": diagnosis_data.get("processing_notes", ()),
+        "disclaimer": _MEDICAL_DISCLAIMER,
+    })
+
 
 @router.post(
     "/",
+    # Documents the response only; the handler returns pre-serialized JSON bytes
     response_model=DiagnosisResponse,
     status_code=status.HTTP_200_OK,
     summary="Generate AI diagnosis",
@@ -60,53 +138,62 @@ router = APIRouter(prefix="/diagnosis", tags=["diagnosis"])
             "description": "Internal server error",
             "model": ErrorResponse,
         },
+        502: {
+            "description": "AI service returned an invalid diagnosis",
+            "model": ErrorResponse,
+        },
+        503: {
+            "description": "AI service temporarily unavailable",
+            "model": ErrorResponse,
+        },
     },
+    # The body is parsed from raw bytes in the handler, so describe it here
+    openapi_extra=json_body_openapi(DiagnosisBody),
 )
 async def generate_diagnosis(
-    diagnosis_request: DiagnosisRequest,
+    request: Request,
     current_user: dict = Depends(get_current_user),
-    _: None = Depends(check_rate_limit_dependency),
-) -> DiagnosisResponse:
+) -> Response:
     """
     Generate AI diagnosis based on symptoms and patient information.
     
     Args:
-        request: FastAPI request object
-        diagnosis_request: Patient symptoms and information
+        request: FastAPI request object carrying the patient symptoms and information
         current_user: Current authenticated user
         
     Returns:
         AI-generated diagnosis with recommendations
         
     Raises:
+        RequestValidationError: If the body is invalid
         HTTPException: On processing errors
     """
+    diagnosis_request = (await parse_json_body(request, DiagnosisBody)).diagnosis_request
+    
+    started_ns = time.perf_counter_ns()
+    
     try:
-        logger.info(
-            f"Processing diagnosis request",
-            extra={
-                "user_id": current_user.get("sub"),
-                "symptoms_count": len(diagnosis_request.symptoms),
-                "patient_age": diagnosis_request.patient_age,
-                "severity": diagnosis_request.severity_level.value,
-            }
-        )
-        
         # Process diagnosis request
         diagnosis_response = await diagnosis_service.process_diagnosis_request(
             diagnosis_request
         )
         
-        logger.info(
-            f"Diagnosis generated successfully",
-            extra={
-                "user_id": current_user.get("sub"),
-                "diagnosis": diagnosis_response.diagnosis,
-                "confidence_score": diagnosis_response.confidence_score,
-            }
-        )
+        # One event per completed request; failures are logged by the handlers below
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Diagnosis generated successfully",
+                extra={
+                    "user_id": current_user["sub"],
+                    "symptoms_count": len(diagnosis_request.symptoms),
+                    "patient_age": diagnosis_request.patient_age,
+                    "severity": diagnosis_request.severity_level.value,
+                    "diagnosis": diagnosis_response.diagnosis,
+                    "confidence_score": diagnosis_response.confidence_score,
+                    "duration_us": (time.perf_counter_ns() - started_ns) // 1000,
+                }
+            )
         
-        return diagnosis_response
+        return _json_response(diagnosis_response)
         
     except DiagnosisServiceError as e:
         logger.error(f"Diagnosis service error: {e}")
@@ -114,6 +201,12 @@ async def generate_diagnosis(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Diagnosis processing failed: {str(e)}",
         )
+    except OpenAIResponseParseError as e:
+        logger.warning(f"OpenAI response could not be parsed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"AI service returned an invalid diagnosis: {str(e)}",
+        )
     except OpenAIServiceError as e:
         logger.error(f"OpenAI service error: {e}")
         raise HTTPException(
@@ -162,21 +255,24 @@ async def validate_symptoms(
         Validation result
     """
     try:
-        logger.info(
-            f"Validating symptoms",
-            extra={
-                "user_id": current_user.get("sub"),
-                "symptoms_count": len(symptoms),
-            }
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Validating symptoms",
+                extra={
+                    "user_id": current_user["sub"],
+                    "symptoms_count": len(symptoms),
+                }
+            )
         
         # Simple validation - check if symptoms are not empty and reasonable
         valid_symptoms = []
         invalid_symptoms = []
         
+        # FastAPI has already validated list[str]; strip each symptom once
         for symptom in symptoms:
-            if isinstance(symptom, str) and 2 <= len(symptom.strip()) <= 100:
-                valid_symptoms.append(symptom.strip().lower())
+            stripped = symptom.strip()
+            if 2 <= len(stripped) <= 100:
+                valid_symptoms.append(stripped.lower())
             else:
                 invalid_symptoms.append(symptom)
         
@@ -202,6 +298,7 @@ async def validate_symptoms(
 
 @router.post(
     "/structure",
+    # Documents the response only; the handler returns pre-serialized JSON bytes
     response_model=StructuredDiagnosisResponse,
     status_code=status.HTTP_200_OK,
     summary="Generate simplified structured AI diagnosis",
@@ -227,17 +324,22 @@ async def validate_symptoms(
             "description": "Internal server error",
             "model": ErrorResponse,
         },
+        502: {
+            "description": "AI service returned an invalid diagnosis",
+            "model": ErrorResponse,
+        },
         503: {
             "description": "AI service temporarily unavailable",
             "model": ErrorResponse,
         },
     },
+    # The body is parsed from raw bytes in the handler, so describe it here
+    openapi_extra=json_body_openapi(StructuredDiagnosisBody),
 )
 async def generate_simplified_structured_diagnosis(
-    structured_request: SimplifiedStructuredDiagnosisRequest,
+    request: Request,
     current_user: dict = Depends(get_current_user),
-    _: None = Depends(check_rate_limit_dependency),
-) -> StructuredDiagnosisResponse:
+) -> Response:
     """
     Generate AI diagnosis using simplified structured patient data.
     
@@ -245,84 +347,93 @@ async def generate_simplified_structured_diagnosis(
     comprehensive diagnosis with safety considerations.
     
     Args:
-        structured_request: Simplified structured patient data
+        request: FastAPI request object carrying the structured patient data
         current_user: Current authenticated user
         
     Returns:
         Comprehensive structured diagnosis with safety considerations
         
     Raises:
-        HTTPException: On validation errors, service failures, or processing errors
+        RequestValidationError: If the body is invalid
+        HTTPException: On service failures or processing errors
     """
+    structured_request = (await parse_json_body(request, StructuredDiagnosisBody)).structured_request
+    request_id = structured_request.patient_profile.request_id
+    
+    started_ns = time.perf_counter_ns()
+    
     try:
-        logger.info(
-            f"Processing simplified structured diagnosis request",
-            extra={
-                "user_id": current_user.get("sub"),
-                "request_id": structured_request.patient_profile.request_id,
-                "patient_age": structured_request.patient_profile.age,
-                "primary_symptom": structured_request.primary_complaint.main_symptom,
-                "severity": structured_request.primary_complaint.severity,
-                "allergies_count": len(structured_request.medical_context.allergies),
-            }
-        )
-        
         # Convert to dict for OpenAI processing
-        request_dict = structured_request.dict()
+        request_dict = structured_request.model_dump()
         
-        # Generate diagnosis using OpenAI
-        diagnosis_data = await openai_service.generate_structured_diagnosis(request=request_dict)
+        # Generate diagnosis using OpenAI, unless an identical request was answered
+        # recently or is already being answered
+        cache_key = diagnosis_cache_key(request_dict)
+        diagnosis_data = diagnosis_cache.get(cache_key)
+        if diagnosis_data is None:
+            diagnosis_data = await coalesce_inflight(
+                cache_key, lambda: structured_diagnosis_batcher.submit(request_dict)
+            )
         
-        # Compose the structured response
-        from app.models.structured_response import (
-            StructuredDiagnosisResponse,
-            SafetyAssessment, 
-            AllergyConsideration,
-            RiskAssessment,
-            TreatmentRecommendation
-        )
-        from app.models.response import PossibleDiagnosis
+        response = _build_structured_response(structured_request, diagnosis_data)
+        # Only output that passed validation is reused
+        diagnosis_cache[cache_key] = diagnosis_data
         
-        response = StructuredDiagnosisResponse(
-            request_id=structured_request.patient_profile.request_id,
-            patient_age=structured_request.patient_profile.age,
-            primary_symptom=structured_request.primary_complaint.main_symptom,
-            possible_diagnoses=[PossibleDiagnosis(**diag) for diag in diagnosis_data.get("possible_diagnoses", [])],
-            clinical_reasoning=diagnosis_data.get("clinical_reasoning", ""),
-            differential_considerations=diagnosis_data.get("differential_considerations", []),
-            safety_assessment=SafetyAssessment(
-                allergy_considerations=AllergyConsideration(**diagnosis_data.get("safety_assessment", {}).get("allergy_considerations", {})),
-                condition_interactions=diagnosis_data.get("safety_assessment", {}).get("condition_interactions", []),
-                safety_warnings=diagnosis_data.get("safety_assessment", {}).get("safety_warnings", [])
-            ),
-            risk_assessment=RiskAssessment(**diagnosis_data.get("risk_assessment", {})),
-            recommended_investigations=diagnosis_data.get("recommended_investigations", []),
-            treatment_recommendations=TreatmentRecommendation(**diagnosis_data.get("treatment_recommendations", {})),
-            patient_education=diagnosis_data.get("patient_education", []),
-            warning_signs=diagnosis_data.get("warning_signs", []),
-            confidence_score=diagnosis_data.get("confidence_score", 0.0),
-            processing_notes=diagnosis_data.get("processing_notes", []),
-            disclaimer=settings.medical_disclaimer,
-        )
+        # One event per completed request; failures are logged by the handler below
+        if logger.isEnabledFor(logging.INFO):
+            primary_complaint = structured_request.primary_complaint
+            logger.info(
+                "Simplified structured diagnosis generated successfully",
+                extra={
+                    "user_id": current_user["sub"],
+                    "request_id": request_id,
+                    "patient_age": response.patient_age,
+                    "primary_symptom": primary_complaint.main_symptom,
+                    "severity": primary_complaint.severity,
+                    "allergies_count": len(structured_request.medical_context.allergies),
+                    "primary_diagnosis": response.possible_diagnoses[0].name if response.possible_diagnoses else "Unknown",
+                    "confidence_score": response.confidence_score,
+                    "duration_us": (time.perf_counter_ns() - started_ns) // 1000,
+                }
+            )
         
-        logger.info(
-            f"Simplified structured diagnosis generated successfully",
-            extra={
-                "user_id": current_user.get("sub"),
-                "request_id": structured_request.patient_profile.request_id,
-                "primary_diagnosis": response.possible_diagnoses[0].name if response.possible_diagnoses else "Unknown",
-                "confidence_score": response.confidence_score,
-            }
-        )
-        
-        return response
+        return _json_response(response)
         
+    except OpenAIResponseParseError as e:
+        # Malformed upstream output is a bad gateway, not an outage
+        logger.warning(
+            f"OpenAI response could not be parsed: {e}",
+            extra={"user_id": current_user.get("sub"), "request_id": request_id},
+        )
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"AI service returned an invalid diagnosis: {str(e)}",
+        )
+    except ValidationError as e:
+        logger.warning(
+            f"OpenAI output failed response validation: {e.error_count()} errors",
+            extra={"user_id": current_user.get("sub"), "request_id": request_id},
+        )
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"AI service returned an invalid diagnosis: {str(e)}",
+        )
+    except OpenAIServiceError as e:
+        # Upstream outages and timeouts are expected; warn rather than page
+        logger.warning(
+            f"OpenAI service error: {e}",
+            extra={"user_id": current_user.get("sub"), "request_id": request_id},
+        )
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"AI service temporarily unavailable: {str(e)}",
+        )
     except Exception as e:
         logger.error(
             f"Simplified structured diagnosis error: {e}",
             extra={
                 "user_id": current_user.get("sub"),
-                "request_id": structured_request.patient_profile.request_id,
+                "request_id": request_id,
                 "error": str(e),
             }
         )
@@ -332,3 +443,109 @@ async def generate_simplified_structured_diagnosis(
         )
 
 
+async def _stream_structured_diagnosis(
+    structured_request: SimplifiedStructuredDiagnosisRequest,
+    current_user: dict,
+) -> AsyncIterator[bytes]:
+    """
+    Produce the NDJSON events of a streamed structured diagnosis.
+    
+    Emits {"type": "delta", "content": ...} for each fragment of the model's JSON
+    as it is generated, then a single {"type": "result", "data": ...} with the
+    validated response, or {"type": "error", "detail": ...} if it failed.
+    
+    Args:
+        structured_request: Validated structured request
+        current_user: Current authenticated user
+        
+    Yields:
+        Newline-terminated JSON events
+    """
+    request_id = structured_request.patient_profile.request_id
+    try:
+        request_dict = structured_request.model_dump()
+        cache_key = diagnosis_cache_key(request_dict)
+        diagnosis_data = diagnosis_cache.get(cache_key)
+        if diagnosis_data is None:
+            parts = []
+            async for delta in openai_service.stream_structured_diagnosis(request_dict):
+                parts.append(delta)
+                yield orjson.dumps({"type": "delta", "content": delta}) + b"\n"
+            diagnosis_data = orjson.loads("".join(parts))
+
+        response = _build_structured_response(structured_request, diagnosis_data)
+        diagnosis_cache[cache_key] = diagnosis_data
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Streamed structured diagnosis generated successfully",
+                extra={
+                    "user_id": current_user["sub"],
+                    "request_id": request_id,
+                    "confidence_score": response.confidence_score,
+                }
+            )
+
+        yield b'{"type":"result","data":' + response.model_dump_json(exclude_none=True).encode() + b"}\n"
+
+    except Exception as e:
+        logger.error(
+            f"Streamed structured diagnosis error: {e}",
+            extra={
+                "user_id": current_user.get("sub"),
+                "request_id": request_id,
+                "error": str(e),
+            }
+        )
+        # Headers are already sent, so failures are reported in-band
+        yield orjson.dumps({"type": "error", "detail": f"Simplified structured diagnosis failed: {e}"}) + b"\n"
+
+
+@router.post(
+    "/structure/stream",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Stream simplified structured AI diagnosis",
+    description="Stream a structured diagnosis as newline-delimited JSON events while it is generated",
+    responses={
+        200: {
+            "description": "NDJSON stream of delta events followed by a result or error event",
+            "content": {"application/x-ndjson": {}},
+        },
+        401: {
+            "description": "Unauthorized",
+            "model": ErrorResponse,
+        },
+        429: {
+            "description": "Rate limit exceeded",
+            "model": ErrorResponse,
+        },
+    },
+    # The body is parsed from raw bytes in the handler, so describe it here
+    openapi_extra=json_body_openapi(StructuredDiagnosisBody),
+)
+async def stream_simplified_structured_diagnosis(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Stream AI diagnosis for simplified structured patient data.
+    
+    Clients see the model output as it is generated instead of waiting for the
+    whole completion. Streamed calls are not batched.
+    
+    Args:
+        request: FastAPI request object carrying the structured patient data
+        current_user: Current authenticated user
+        
+    Returns:
+        Streaming NDJSON response
+        
+    Raises:
+        RequestValidationError: If the body is invalid
+    """
+    structured_request = (await parse_json_body(request, StructuredDiagnosisBody)).structured_request
+    return StreamingResponse(
+        _stream_structured_diagnosis(structured_request, current_user),
+        media_type="application/x-ndjson",
+    )
@@ -1,10 +1,12 @@
 """Health check router for service monitoring."""
 
-from fastapi import APIRouter, Depends, status
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Tuple
+from fastapi import APIRouter, Query, Request, Response, status
 from app.models import HealthCheckResponse
 from app.services.openai_service import openai_service
 from app.middleware.rate_limiter import rate_limiter
-from app.middleware.auth import get_current_user_optional
 from app.config.settings import settings
 from app.utils.logger import get_logger
 
@@ -12,49 +14,104 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/health", tags=["health"])
 
+# Seconds a dependency check result is reused, so probe storms cost one real check
+HEALTH_CHECK_TTL = 5.0
+
+# Seconds a Redis ping may take before Redis is reported unhealthy
+REDIS_PING_TIMEOUT = 0.5
+
+# Last result per dependency as (monotonic time, healthy)
+_check_results: Dict[str, Tuple[float, bool]] = {}
+_check_locks: Dict[str, asyncio.Lock] = {}
+
+# Encoded /health bodies by deep flag as (monotonic time, body)
+_health_bodies: Dict[bool, Tuple[float, bytes]] = {}
+
+
+async def _cached_check(name: str, check: Callable[[], Awaitable[bool]]) -> bool:
+    """
+    Run a dependency health check at most once per HEALTH_CHECK_TTL.
+    
+    Concurrent callers with an expired result wait for a single check.
+    
+    Args:
+        name: Dependency name the result is cached under
+        check: Coroutine function returning whether the dependency is healthy
+        
+    Returns:
+        Whether the dependency is healthy
+    """
+    cached = _check_results.get(name)
+    if cached is not None and time.monotonic() - cached[0] < HEALTH_CHECK_TTL:
+        return cached[1]
+    
+    async with _check_locks.setdefault(name, asyncio.Lock()):
+        # Another caller may have refreshed it while we waited
+        cached = _check_results.get(name)
+        if cached is not None and time.monotonic() - cached[0] < HEALTH_CHECK_TTL:
+            return cached[1]
+        
+        healthy = await check()
+        _check_results[name] = (time.monotonic(), healthy)
+        return healthy
+
+
+async def _redis_health_check() -> bool:
+    """Check that Redis is connected and answers a ping."""
+    try:
+        # Connected at startup; this only reconnects after a failure, and
+        # init_redis rate-limits its own retries
+        if rate_limiter.redis_client is None:
+            await rate_limiter.init_redis()
+            if rate_limiter.redis_client is None:
+                return False
+        await asyncio.wait_for(rate_limiter.redis_client.ping(), REDIS_PING_TIMEOUT)
+        return True
+    except Exception as e:
+        logger.error(f"Redis health check failed: {e}")
+        return False
+
 
 @router.get(
     "/",
+    # Documents the response; healthy-path bodies are returned pre-serialized
     response_model=HealthCheckResponse,
     status_code=status.HTTP_200_OK,
     summary="Health check",
     description="Check the health status of the AI diagnosis service",
 )
 async def health_check(
-    current_user: dict = Depends(get_current_user_optional),
-) -> HealthCheckResponse:
+    deep: bool = Query(False, description="Verify OpenAI with a real API call instead of a TCP connect"),
+) -> Response:
     """
     Check the health status of the AI diagnosis service.
     
     Args:
-        current_user: Optional current user information
+        deep: Whether to verify OpenAI with a completion call
         
     Returns:
         Health check response with service status
     """
+    # /health is a public path and the body carries nothing caller-specific, so
+    # it is reused for as long as the dependency results it reports are
+    cached = _health_bodies.get(deep)
+    if cached is not None and time.monotonic() - cached[0] < HEALTH_CHECK_TTL:
+        return Response(cached[1], media_type="application/json")
+    
     try:
         # Check external services
         services_status = {}
         
         # Check OpenAI service
-        try:
-            openai_healthy = await openai_service.health_check()
-            services_status["openai"] = "healthy" if openai_healthy else "unhealthy"
-        except Exception as e:
-            logger.error(f"OpenAI health check failed: {e}")
-            services_status["openai"] = "unhealthy"
+        if deep:
+            openai_healthy = await _cached_check("openai_api", openai_service.health_check)
+        else:
+            openai_healthy = await _cached_check("openai", openai_service.check_connectivity)
+        services_status["openai"] = "healthy" if openai_healthy else "unhealthy"
         
         # Check Redis service
-        try:
-            await rate_limiter.init_redis()
-            if rate_limiter.redis_client:
-                await rate_limiter.redis_client.ping()
-                services_status["redis"] = "healthy"
-            else:
-                services_status["redis"] = "unhealthy"
-        except Exception as e:
-            logger.error(f"Redis health check failed: {e}")
-            services_status["redis"] = "unhealthy"
+        redis_healthy = await _cached_check("redis", _redis_health_check)
+        services_status["redis"] = "healthy" if redis_healthy else "unhealthy"
         
         # Determine overall status
         overall_status = "healthy"
@@ -68,15 +125,17 @@ async def health_check(
             extra={
                 "status": overall_status,
                 "services": services_status,
-                "user_id": current_user.get("sub") if current_user else None,
             }
         )
         
-        return HealthCheckResponse(
+        body = HealthCheckResponse(
             status=overall_status,
             version=settings.app_version,
             services=services_status,
-        )
+        ).model_dump_json().encode()
+        _health_bodies[deep] = (time.monotonic(), body)
+        
+        return Response(body, media_type="application/json")
         
     except Exception as e:
         logger.error(f"Health check failed: {e}")
@@ -87,20 +146,28 @@ async def health_check(
         )
 
 
-@router.get(
-    "/live",
-    status_code=status.HTTP_200_OK,
-    summary="Liveness probe",
-    description="Simple liveness probe for Kubernetes",
-)
-async def liveness_probe() -> dict:
+# Pre-encoded liveness body
+_LIVE_BODY = b'{"status":"alive"}'
+
+
+async def liveness_probe(request: Request) -> Response:
     """
     Simple liveness probe for Kubernetes.
     
+    Registered as a plain Starlette route, so the most frequently hit endpoint
+    skips FastAPI dependency solving and response serialization.
+    
+    Args:
+        request: Incoming request (unused)
+        
     Returns:
         Simple status response
     """
-    return {"status": "alive"}
+    return Response(_LIVE_BODY, media_type="application/json")
+
+
+# Starlette's add_route does not apply the APIRouter prefix itself
+router.add_route(f"{router.prefix}/live", liveness_probe, methods=["GET"])
 
 
 @router.get(
@@ -118,7 +185,7 @@ async def readiness_probe() -> dict:
     """
     try:
         # Check if OpenAI service is accessible
-        openai_healthy = await openai_service.health_check()
+        openai_healthy = await _cached_check("openai", openai_service.check_connectivity)
         
         if openai_healthy:
             return {"status": "ready"}
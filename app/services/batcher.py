@@ -0,0 +1,139 @@
+"""Micro-batching of concurrent calls into a single batched call."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+from app.config import settings
+from app.services.openai_service import openai_service
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BatchFn = Callable[[List[Any]], Awaitable[List[Any]]]
+
+_CLOSED_MESSAGE = "Batcher closed before the item was dispatched"
+
+
+class AsyncBatcher:
+    """
+    Coalesce concurrent submissions into batches for one batch function call.
+
+    A background consumer drains up to max_batch queued items, waiting at most
+    max_wait_ms after the first one, and resolves each caller's future with the
+    result at the same index. With max_batch of 1 items are passed straight
+    through with no queueing.
+    """
+
+    def __init__(self, batch_fn: BatchFn, max_batch: int = 8, max_wait_ms: int = 25):
+        """
+        Initialize batcher.
+
+        Args:
+            batch_fn: Coroutine function mapping a list of items to a list of results
+            max_batch: Maximum number of items per batch
+            max_wait_ms: Maximum time to wait for a batch to fill
+        """
+        self._batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Submit an item and wait for its result.
+
+        Args:
+            item: Item to process
+
+        Returns:
+            Result of the batch function for this item
+
+        Raises:
+            Exception: Whatever the batch function raised for the batch
+        """
+        if self.max_batch <= 1:
+            return (await self._batch_fn([item]))[0]
+
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._consume(self._queue))
+
+        future = loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def close(self) -> None:
+        """
+        Stop the consumer and fail submissions that were not dispatched yet.
+
+        Batches already dispatched run to completion.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        if self._queue is not None:
+            pending = []
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            self._fail(pending, RuntimeError(_CLOSED_MESSAGE))
+
+    async def _consume(self, queue: asyncio.Queue) -> None:
+        """Collect batches from the queue and dispatch them without blocking collection."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            try:
+                while len(batch) < self.max_batch:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Items already taken off the queue are not drained by close()
+                self._fail(batch, RuntimeError(_CLOSED_MESSAGE))
+                raise
+
+            task = loop.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        """Run the batch function and resolve every future in the batch."""
+        try:
+            results = await self._batch_fn([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Batch returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            logger.error(f"Batch of {len(batch)} failed: {e}")
+            self._fail(batch, e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    def _fail(batch: List[Tuple[Any, asyncio.Future]], error: Exception) -> None:
+        """Resolve every still-pending future in the batch with error."""
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+
+# Global batcher for structured diagnosis calls
+structured_diagnosis_batcher = AsyncBatcher(
+    openai_service.generate_structured_diagnoses_batch,
+    max_batch=settings.openai_batch_max_size,
+    max_wait_ms=settings.openai_batch_max_wait_ms,
+)
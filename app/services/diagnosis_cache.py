@@ -0,0 +1,82 @@
+"""Content-addressed cache and in-flight deduplication of structured diagnoses."""
+
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict
+import orjson
+from cachetools import TTLCache
+from app.config import settings
+
+# Validated OpenAI diagnosis data keyed by a hash of the clinical request content.
+# A TTL of 0 expires entries immediately, which disables caching.
+diagnosis_cache: TTLCache = TTLCache(maxsize=settings.diagnosis_cache_size, ttl=settings.diagnosis_cache_ttl)
+
+# Futures of diagnosis calls currently running, by cache key
+_INFLIGHT: Dict[bytes, asyncio.Future] = {}
+
+# Per-submission metadata that does not affect the diagnosis
+_PER_REQUEST_FIELDS = frozenset({"request_id", "timestamp"})
+
+
+def diagnosis_cache_key(request_dict: Dict[str, Any]) -> bytes:
+    """
+    Get the cache key for a structured diagnosis request.
+
+    Args:
+        request_dict: Dumped structured diagnosis request
+
+    Returns:
+        Digest of the request content, ignoring per-submission metadata
+    """
+    profile = request_dict["patient_profile"]
+    content = {
+        **request_dict,
+        "patient_profile": {k: v for k, v in profile.items() if k not in _PER_REQUEST_FIELDS},
+    }
+    return hashlib.blake2b(orjson.dumps(content, option=orjson.OPT_SORT_KEYS), digest_size=16).digest()
+
+
+async def coalesce_inflight(key: bytes, call: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run call once for concurrent requests with the same key.
+
+    The first caller runs it; callers arriving while it is in flight await the
+    same result. This complements diagnosis_cache, which only helps once a call
+    has completed.
+
+    Args:
+        key: Cache key of the request
+        call: Zero-argument coroutine function producing the result
+
+    Returns:
+        Result of the shared call
+
+    Raises:
+        Exception: Whatever the shared call raised
+    """
+    future = _INFLIGHT.get(key)
+    if future is not None:
+        try:
+            # Shielded so a disconnecting follower cannot cancel the shared call
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            # The leader was cancelled, not us; make the call ourselves
+            return await call()
+
+    future = _INFLIGHT[key] = asyncio.get_running_loop().create_future()
+    try:
+        result = await call()
+    except Exception as e:
+        future.set_exception(e)
+        # Mark retrieved so a call without followers does not warn at GC
+        future.exception()
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        _INFLIGHT.pop(key, None)
+        if not future.done():
+            future.cancel()
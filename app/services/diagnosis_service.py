@@ -5,10 +5,13 @@ from app.models import DiagnosisRequest, DiagnosisResponse
 from app.services.openai_service import openai_service
 from app.config.settings import settings
 from app.utils.logger import get_logger
-from app.exceptions.custom_exceptions import DiagnosisServiceError
+from app.exceptions.custom_exceptions import DiagnosisServiceError, OpenAIServiceError
 
 logger = get_logger(__name__)
 
+# Settings are frozen, so the disclaimer is bound once
+_MEDICAL_DISCLAIMER = settings.medical_disclaimer
+
 
 class DiagnosisService:
     """Main service for handling diagnosis logic."""
@@ -25,6 +28,7 @@ class DiagnosisService:
             DiagnosisResponse with predicted diagnosis and recommendations
 
         Raises:
+            OpenAIServiceError: If the OpenAI call fails or its response cannot be parsed
             DiagnosisServiceError: On processing failure
         """
         try:
@@ -46,7 +50,7 @@ class DiagnosisService:
             response = DiagnosisResponse(
                 diagnosis=diagnosis_data.get("diagnosis", "Unknown"),
                 confidence_score=diagnosis_data.get("confidence_score", 0.0),
-                suggested_investigations=diagnosis_data.get("suggested_investigations", []),
+                suggested_investigations=diagnosis_data.get("suggested_investigations", ()),
                 recommended_medications=[{
                     "name": med.get("name", "Unknown"),
                     "dosage": med.get("dosage", ""),
@@ -54,16 +58,19 @@ class DiagnosisService:
                     "duration": med.get("duration", ""),
                     "reason": med.get("reason", "Not provided"),
                     "notes": med.get("notes", "")
-                } for med in diagnosis_data.get("recommended_medications", [])],
-                lifestyle_advice=diagnosis_data.get("lifestyle_advice", []),
+                } for med in diagnosis_data.get("recommended_medications", ())],
+                lifestyle_advice=diagnosis_data.get("lifestyle_advice", ()),
                 follow_up_recommendations=diagnosis_data.get("follow_up_recommendations", ""),
-                disclaimer=settings.medical_disclaimer
+                disclaimer=_MEDICAL_DISCLAIMER
             )
 
             logger.info(f"Successfully processed diagnosis request with confidence score {response.confidence_score}")
 
             return response
 
+        except OpenAIServiceError:
+            # Already logged by the OpenAI service; the router maps it to 502/503
+            raise
         except Exception as e:
             logger.error(f"Diagnosis processing failed: {e}")
             raise DiagnosisServiceError(f"Diagnosis processing failed: {e}")
@@ -2,21 +2,43 @@
 
 import json
 import asyncio
-from typing import Dict, Any, Optional
-from openai import AsyncOpenAI
+import orjson  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+from typing import AsyncIterator, Dict, Any, List, Optional
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from app.config import settings
 from app.utils.logger import get_logger
-from app.exceptions.custom_exceptions import OpenAIServiceError
+from app.exceptions.custom_exceptions import OpenAIResponseParseError, OpenAIServiceError
 
 logger = get_logger(__name__)
 
+# Appended to the structured system prompt when several cases share one call
+_BATCH_INSTRUCTIONS = '''
+        
+        MULTIPLE CASES:
+        The message contains several independent patients, each introduced by "=== CASE <request_id> ===".
+        Assess every case on its own, never mixing information between cases, and respond with
+        {"cases": [...]} holding exactly one JSON object in the format above per case. Each object
+        must also contain "request_id" set to the request ID of the case it answers.'''
+
 
 class OpenAIService:
     """Service for interacting with OpenAI API."""
 
     def __init__(self):
         """Initialize OpenAI service."""
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+        # One pooled HTTP client for every call; idle connections are kept well past
+        # httpx's 5s default so sparse traffic does not redo the TLS handshake
+        self.client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=settings.openai_max_connections,
+                    max_keepalive_connections=settings.openai_max_connections,
+                    keepalive_expiry=settings.openai_keepalive_expiry,
+                ),
+            ),
+        )
         self.model = settings.openai_model
         self.max_tokens = settings.openai_max_tokens
         self.temperature = settings.openai_temperature
@@ -47,6 +69,7 @@ class OpenAIService:
             Dict containing diagnosis information
             
         Raises:
+            OpenAIResponseParseError: If the response is not valid JSON
             OpenAIServiceError: If OpenAI API call fails
         """
         try:
@@ -86,7 +109,7 @@ class OpenAIService:
                 raise OpenAIServiceError("Empty response from OpenAI API")
 
             # Parse JSON response
-            diagnosis_data = json.loads(content)
+            diagnosis_data = orjson.loads(content)
             
             logger.info(f"Successfully generated diagnosis: {diagnosis_data.get('diagnosis', 'Unknown')}")
             
@@ -94,7 +117,7 @@ class OpenAIService:
 
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse OpenAI response as JSON: {e}")
-            raise OpenAIServiceError(f"Invalid JSON response from OpenAI: {e}")
+            raise OpenAIResponseParseError(f"Invalid JSON response from OpenAI: {e}")
         except Exception as e:
             logger.error(f"OpenAI API call failed: {e}")
             raise OpenAIServiceError(f"OpenAI API call failed: {e}")
@@ -113,6 +136,7 @@ class OpenAIService:
             Dict containing comprehensive diagnosis information
             
         Raises:
+            OpenAIResponseParseError: If the response is not valid JSON
             OpenAIServiceError: If OpenAI API call fails
         """
         try:
@@ -145,19 +169,151 @@ class OpenAIService:
                 raise OpenAIServiceError("Empty response from OpenAI API")
 
             # Parse JSON response
-            diagnosis_data = json.loads(content)
+            diagnosis_data = orjson.loads(content)
             
-            logger.info(f"Successfully generated structured diagnosis with {len(diagnosis_data.get('possible_diagnoses', []))} possible diagnoses")
+            logger.info(f"Successfully generated structured diagnosis with {len(diagnosis_data.get('possible_diagnoses', ()))} possible diagnoses")
             
             return diagnosis_data
 
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse OpenAI structured response as JSON: {e}")
-            raise OpenAIServiceError(f"Invalid JSON response from OpenAI: {e}")
+            raise OpenAIResponseParseError(f"Invalid JSON response from OpenAI: {e}")
         except Exception as e:
             logger.error(f"Structured OpenAI API call failed: {e}")
             raise OpenAIServiceError(f"Structured OpenAI API call failed: {e}")
 
+    async def stream_structured_diagnosis(
+        self,
+        request: Dict[str, Any],
+    ) -> AsyncIterator[str]:
+        """
+        Stream a structured diagnosis as raw JSON text deltas.
+        
+        Args:
+            request: Structured diagnosis request data
+            
+        Yields:
+            Fragments of the diagnosis JSON object, in order
+            
+        Raises:
+            OpenAIServiceError: If the OpenAI API call fails
+        """
+        try:
+            prompt = self._create_structured_diagnosis_prompt(request)
+
+            logger.info(f"Streaming structured diagnosis for request ID {request.get('patient_profile', {}).get('request_id', 'unknown')}")
+
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": self._get_structured_system_prompt(),
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt,
+                    },
+                ],
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                response_format={"type": "json_object"},
+                stream=True,
+            )
+
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        except Exception as e:
+            logger.error(f"Structured OpenAI stream failed: {e}")
+            raise OpenAIServiceError(f"Structured OpenAI stream failed: {e}")
+
+    async def generate_structured_diagnoses_batch(
+        self,
+        requests: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate structured diagnoses for several patients in one OpenAI call.
+        
+        Args:
+            requests: Structured diagnosis request data, one per patient
+            
+        Each case in the response echoes the request ID of its patient and is
+        matched back by that ID, never by position.
+        
+        Returns:
+            Diagnosis dicts in the same order as the requests
+            
+        Raises:
+            OpenAIResponseParseError: If the response is not valid JSON or any case
+                is missing, duplicated or unknown
+            OpenAIServiceError: If the OpenAI API call fails
+        """
+        if len(requests) == 1:
+            return [await self.generate_structured_diagnosis(requests[0])]
+
+        request_ids = [request["patient_profile"]["request_id"] for request in requests]
+        if len(set(request_ids)) != len(request_ids):
+            # Cases could not be told apart in the response; answer them one by one
+            return list(await asyncio.gather(*map(self.generate_structured_diagnosis, requests)))
+
+        try:
+            prompt = "\n\n".join(
+                f"=== CASE {request_id} ===\n{self._create_structured_diagnosis_prompt(request)}"
+                for request_id, request in zip(request_ids, requests)
+            )
+
+            logger.info(f"Generating batched structured diagnosis for {len(requests)} cases")
+
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": self._get_structured_system_prompt() + _BATCH_INSTRUCTIONS,
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt,
+                    },
+                ],
+                max_tokens=min(self.max_tokens * len(requests), settings.openai_max_output_tokens),
+                temperature=self.temperature,
+                response_format={"type": "json_object"},
+            )
+
+            if not response.choices:
+                raise OpenAIServiceError("No response from OpenAI API")
+
+            content = response.choices[0].message.content
+            if not content:
+                raise OpenAIServiceError("Empty response from OpenAI API")
+
+            cases = orjson.loads(content).get("cases")
+            if not isinstance(cases, list):
+                raise OpenAIResponseParseError("Batched response has no list of cases")
+
+            by_id = {}
+            for case in cases:
+                request_id = case.pop("request_id", None) if isinstance(case, dict) else None
+                if request_id not in request_ids or request_id in by_id:
+                    raise OpenAIResponseParseError(f"Batched response has an unknown or duplicate case: {request_id!r}")
+                by_id[request_id] = case
+            if len(by_id) != len(request_ids):
+                raise OpenAIResponseParseError(f"Batched response is missing {len(request_ids) - len(by_id)} cases")
+
+            return [by_id[request_id] for request_id in request_ids]
+
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse OpenAI batched response as JSON: {e}")
+            raise OpenAIResponseParseError(f"Invalid JSON response from OpenAI: {e}")
+        except OpenAIServiceError:
+            raise
+        except Exception as e:
+            logger.error(f"Batched OpenAI API call failed: {e}")
+            raise OpenAIServiceError(f"Batched OpenAI API call failed: {e}")
+
     def _create_diagnosis_prompt(
         self,
         symptoms: list,
@@ -453,7 +609,33 @@ class OpenAIService:
         
         Remember: This comprehensive assessment should guide clinical decision-making but never replace professional medical evaluation and patient-provider relationship.'''
 
+    async def close(self) -> None:
+        """Close pooled connections to the OpenAI API."""
+        await self.client.close()
 
+    async def check_connectivity(self, timeout: float = 1.0) -> bool:
+        """
+        Check that the OpenAI API host accepts TCP connections.
+        
+        Much cheaper than health_check: no TLS handshake, no API call and no
+        quota used, which suits frequent liveness and readiness probes.
+        
+        Args:
+            timeout: Seconds to wait for the connection
+            
+        Returns:
+            True if the connection was established
+        """
+        url = self.client.base_url
+        port = url.port or (443 if url.scheme == "https" else 80)
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(url.host, port), timeout)
+            writer.close()
+            await writer.wait_closed()
+            return True
+        except Exception as e:
+            logger.error(f"OpenAI connectivity check failed: {e!r}")
+            return False
 
     async def health_check(self) -> bool:
         """Check if OpenAI service is healthy."""
@@ -1,14 +1,28 @@
 """Structured logging utility."""
 
 import sys
+import atexit
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional
+import orjson
 import structlog
 from app.config.settings import settings
 
 
+def _orjson_dumps(obj, **kwargs) -> str:
+    """Serialize a log event with orjson, returning str for stdlib handlers."""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS, **kwargs).decode()
+
+
+# Background thread that writes log records, started once per process
+_log_listener: Optional[QueueListener] = None
+
+
 def setup_logging() -> None:
     """Setup structured logging configuration."""
+    global _log_listener
     # Configure structlog
     structlog.configure(
         processors=[
@@ -20,7 +34,7 @@ def setup_logging() -> None:
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
             structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer(),
+            structlog.processors.JSONRenderer(serializer=_orjson_dumps),
         ],
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
@@ -28,12 +42,23 @@ def setup_logging() -> None:
         cache_logger_on_first_use=True,
     )
 
-    # Configure standard logging
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=getattr(logging, settings.log_level.upper()),
-    )
+    # Configure standard logging. Handlers only enqueue records; the listener
+    # thread does the stdout writes, so request handlers never wait on I/O.
+    if _log_listener is None:
+        log_queue = queue.SimpleQueue()
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(logging.Formatter("%(message)s"))
+
+        # Attached directly: basicConfig does nothing once the root logger has
+        # handlers, which would leave the listener with an empty queue
+        root_logger = logging.getLogger()
+        root_logger.addHandler(QueueHandler(log_queue))
+        root_logger.setLevel(getattr(logging, settings.log_level.upper()))
+
+        _log_listener = QueueListener(log_queue, stream_handler)
+        _log_listener.start()
+        # Drain queued records on interpreter exit
+        atexit.register(_log_listener.stop)
 
 
 def get_logger(name: Optional[str] = None) -> structlog.BoundLogger:
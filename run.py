@@ -20,4 +20,7 @@ if __name__ == "__main__":
         reload=settings.debug,
         workers=1 if settings.debug else settings.workers,
         log_level=settings.log_level.lower(),
+        # Installed via uvicorn[standard]; pinned so a missing extra fails loudly
+        loop="uvloop",
+        http="httptools",
     )
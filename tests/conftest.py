@@ -0,0 +1,20 @@
+"""Shared test fixtures."""
+
+from datetime import datetime, timedelta
+import jwt
+import pytest
+from app.config.settings import settings
+
+
+@pytest.fixture
+def auth_headers():
+    """Authorization headers carrying a valid test JWT token."""
+    payload = {
+        "sub": "test_user_123",
+        "username": "test_user",
+        "email": "test@example.com",
+        "exp": datetime.utcnow() + timedelta(hours=1),
+        "iat": datetime.utcnow(),
+    }
+    token = jwt.encode(payload, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    return {"Authorization": f"Bearer {token}"}
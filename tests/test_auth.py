@@ -0,0 +1,84 @@
+"""Tests for authentication helpers."""
+
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+import jwt
+from starlette.requests import Request
+from app.config.settings import settings
+from app.exceptions.custom_exceptions import AuthenticationError
+from app.middleware import api_key_auth
+from app.middleware.auth import (
+    _JWT_CACHE,
+    _collect_auth_headers,
+    _jwt_cache_key,
+    get_current_user_optional,
+    verify_jwt_token,
+)
+
+
+def create_test_token(sub="test_user_123"):
+    """Create a test JWT token."""
+    payload = {"sub": sub, "exp": datetime.utcnow() + timedelta(hours=1)}
+    return jwt.encode(payload, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+
+
+def test_collect_auth_headers_single_pass():
+    """Test that only auth-related headers are collected, first occurrence winning."""
+    scope = {
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"authorization", b"Bearer first"),
+            (b"x-request-id", b"req_001"),
+            (b"authorization", b"Bearer second"),
+        ]
+    }
+    headers = _collect_auth_headers(scope)
+    assert headers == {b"authorization": "Bearer first", b"x-request-id": "req_001"}
+
+
+def test_verify_jwt_token_caches_payload():
+    """Test that verified payloads are cached and returned as copies."""
+    token = create_test_token()
+    payload = verify_jwt_token(token)
+    assert payload["sub"] == "test_user_123"
+    assert _jwt_cache_key(token) in _JWT_CACHE
+
+    payload["auth_type"] = "jwt"
+    assert "auth_type" not in verify_jwt_token(token)
+
+
+def test_verify_jwt_token_rejects_invalid_token():
+    """Test that invalid tokens raise and are not cached."""
+    with pytest.raises(AuthenticationError):
+        verify_jwt_token("not-a-token")
+    assert _jwt_cache_key("not-a-token") not in _JWT_CACHE
+
+
+def test_verify_api_key(monkeypatch):
+    """Test API key comparison against the configured key."""
+    monkeypatch.setattr(api_key_auth, "_EXPECTED_API_KEY", b"k" * 32)
+
+    auth_info = api_key_auth.verify_api_key("k" * 32, "tenderly-backend")
+    assert auth_info["service"] == "tenderly-backend"
+    assert auth_info["authenticated"] is True
+    assert api_key_auth.verify_api_key("k" * 32, "tenderly-backend") is auth_info
+
+    with pytest.raises(AuthenticationError):
+        api_key_auth.verify_api_key("k" * 31)
+    with pytest.raises(AuthenticationError):
+        api_key_auth.verify_api_key("")
+
+
+def test_optional_auth_skips_public_paths():
+    """Test that optional auth resolves to no user on public paths without checking headers."""
+    headers = [(b"authorization", f"Bearer {create_test_token()}".encode())]
+    public = Request({"type": "http", "path": f"{settings.api_prefix}/health/", "headers": headers})
+    private = Request({"type": "http", "path": "/api/v1/other", "headers": headers})
+
+    assert asyncio.run(get_current_user_optional(public)) is None
+    assert asyncio.run(get_current_user_optional(private))["sub"] == "test_user_123"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,66 @@
+"""Tests for the async micro-batcher."""
+
+import asyncio
+import pytest
+from app.services.batcher import AsyncBatcher
+
+
+def test_concurrent_submissions_share_one_batch():
+    """Test that concurrent items are batched together and results keep their order."""
+    calls = []
+
+    async def batch_fn(items):
+        calls.append(list(items))
+        return [item * 10 for item in items]
+
+    async def run():
+        batcher = AsyncBatcher(batch_fn, max_batch=8, max_wait_ms=20)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        await batcher.close()
+        return results
+
+    assert asyncio.run(run()) == [0, 10, 20, 30, 40]
+    assert calls == [[0, 1, 2, 3, 4]]
+
+
+def test_batch_failure_reaches_every_caller():
+    """Test that a failing or mis-sized batch raises for each submitter."""
+    async def batch_fn(items):
+        return items[:1]
+
+    async def run():
+        batcher = AsyncBatcher(batch_fn, max_batch=4, max_wait_ms=20)
+        results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+        await batcher.close()
+        return results
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(run()))
+
+
+def test_batch_size_one_passes_through():
+    """Test that a max batch of one calls the batch function directly."""
+    async def batch_fn(items):
+        return [(items[0], len(items))]
+
+    assert asyncio.run(AsyncBatcher(batch_fn, max_batch=1).submit("x")) == ("x", 1)
+
+
+def test_close_fails_undispatched_submissions():
+    """Test that closing the batcher releases callers whose items were never dispatched."""
+    async def batch_fn(items):
+        return items
+
+    async def run(delay):
+        batcher = AsyncBatcher(batch_fn, max_batch=8, max_wait_ms=10_000)
+        submissions = [asyncio.create_task(batcher.submit(i)) for i in range(3)]
+        await asyncio.sleep(delay)
+        await batcher.close()
+        return await asyncio.wait_for(asyncio.gather(*submissions, return_exceptions=True), 1)
+
+    # Closed while items are still queued, then while a batch is being collected
+    for delay in (0, 0.01):
+        assert all(isinstance(result, RuntimeError) for result in asyncio.run(run(delay)))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
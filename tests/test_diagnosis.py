@@ -1,11 +1,20 @@
 """Tests for the diagnosis endpoint."""
 
+import asyncio
+import copy
+import json
 import pytest
+from types import SimpleNamespace
 from fastapi.testclient import TestClient
 from datetime import datetime, timedelta
-from jose import jwt
+import jwt
 from app.main import app
 from app.config.settings import settings
+from app.exceptions.custom_exceptions import OpenAIServiceError
+from app.models.simplified_structured_request import SimplifiedStructuredDiagnosisRequest
+from app.models.structured_response import StructuredDiagnosisResponse
+from app.services.diagnosis_cache import coalesce_inflight, diagnosis_cache, diagnosis_cache_key
+from app.services.openai_service import openai_service
 
 client = TestClient(app)
 
@@ -117,5 +126,103 @@ def test_successful_diagnosis():
     assert "disclaimer" in result
 
 
+def test_diagnosis_cache_key_ignores_submission_metadata():
+    """Test that resubmitting the same case under a new request id shares a cache key."""
+    example = SimplifiedStructuredDiagnosisRequest.model_config["json_schema_extra"]["example"]
+    request_dict = SimplifiedStructuredDiagnosisRequest.model_validate(example).model_dump()
+    resubmitted = copy.deepcopy(request_dict)
+    resubmitted["patient_profile"].update(request_id="req_002", timestamp="2025-07-23T08:00:00Z")
+    changed = copy.deepcopy(request_dict)
+    changed["patient_profile"]["age"] += 1
+
+    assert diagnosis_cache_key(resubmitted) == diagnosis_cache_key(request_dict)
+    assert diagnosis_cache_key(changed) != diagnosis_cache_key(request_dict)
+
+
+def test_coalesce_inflight_shares_one_call():
+    """Test that concurrent identical requests share a single in-flight call."""
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"confidence_score": 0.5}
+
+    async def run():
+        return await asyncio.gather(*(coalesce_inflight(b"key", call) for _ in range(3)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert results[0] is results[1] is results[2]
+
+
+def test_batched_cases_are_matched_by_request_id(monkeypatch):
+    """Test that batched cases map back by echoed request id and mismatches fail the batch."""
+    example = SimplifiedStructuredDiagnosisRequest.model_config["json_schema_extra"]["example"]
+    requests = []
+    for request_id in ("req_a", "req_b"):
+        request_dict = SimplifiedStructuredDiagnosisRequest.model_validate(example).model_dump()
+        request_dict["patient_profile"]["request_id"] = request_id
+        requests.append(request_dict)
+    replies = []
+
+    async def fake_create(**kwargs):
+        assert kwargs["max_tokens"] <= settings.openai_max_output_tokens
+        message = SimpleNamespace(content=json.dumps({"cases": replies.pop(0)}))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    monkeypatch.setattr(openai_service.client.chat.completions, "create", fake_create)
+    replies.append([{"request_id": "req_b", "confidence_score": 0.2}, {"request_id": "req_a", "confidence_score": 0.1}])
+    results = asyncio.run(openai_service.generate_structured_diagnoses_batch(requests))
+    assert results == [{"confidence_score": 0.1}, {"confidence_score": 0.2}]
+
+    replies.append([{"request_id": "req_a"}, {"request_id": "req_a"}])
+    with pytest.raises(OpenAIServiceError):
+        asyncio.run(openai_service.generate_structured_diagnoses_batch(requests))
+
+
+def test_unparseable_openai_response_is_bad_gateway(monkeypatch):
+    """Test that malformed OpenAI output maps to 502 rather than an outage 503."""
+    async def fake_create(**kwargs):
+        message = SimpleNamespace(content="{not json")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    diagnosis_cache.clear()
+    monkeypatch.setattr(openai_service.client.chat.completions, "create", fake_create)
+    example = SimplifiedStructuredDiagnosisRequest.model_config["json_schema_extra"]["example"]
+    response = client.post(
+        "/api/v1/diagnosis/structure",
+        json={"structured_request": example},
+        headers={"Authorization": f"Bearer {create_test_token()}"}
+    )
+    assert response.status_code == 502
+
+
+def test_structured_diagnosis_stream(monkeypatch):
+    """Test that the stream endpoint relays model deltas and ends with the validated result."""
+    diagnosis = StructuredDiagnosisResponse.model_config["json_schema_extra"]["example"]
+    content = json.dumps(diagnosis)
+
+    async def fake_stream(request):
+        for start in range(0, len(content), 400):
+            yield content[start:start + 400]
+
+    diagnosis_cache.clear()
+    monkeypatch.setattr(openai_service, "stream_structured_diagnosis", fake_stream)
+    example = SimplifiedStructuredDiagnosisRequest.model_config["json_schema_extra"]["example"]
+    response = client.post(
+        "/api/v1/diagnosis/structure/stream",
+        json={"structured_request": example},
+        headers={"Authorization": f"Bearer {create_test_token()}"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert "".join(event["content"] for event in events[:-1]) == content
+    assert events[-1]["type"] == "result"
+    assert events[-1]["data"]["request_id"] == example["patient_profile"]["request_id"]
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,60 @@
+"""Tests for application-level handlers and middleware."""
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_validation_error_body(auth_headers):
+    """Test that field validation errors serialize with a timestamp."""
+    response = client.post(
+        "/api/v1/diagnosis/",
+        json={
+            "diagnosis_request": {
+                "symptoms": ["a"],  # Too short after stripping
+                "patient_age": 25,
+                "severity_level": "moderate",
+                "duration": "3 days"
+            }
+        },
+        headers=auth_headers
+    )
+    assert response.status_code == 422
+    result = response.json()
+    assert result["error"] == "Validation failed"
+    assert result["detail"][0]["loc"][-2:] == ["symptoms", 0]
+    assert result["timestamp"].endswith("+00:00")
+
+
+def test_structured_body_validation_error(auth_headers):
+    """Test that raw-parsed structured bodies report errors like FastAPI body params."""
+    headers = {**auth_headers, "Content-Type": "application/json"}
+
+    response = client.post("/api/v1/diagnosis/structure", json={"structured_request": {}}, headers=headers)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][:2] == ["body", "structured_request"]
+
+    response = client.post("/api/v1/diagnosis/structure", content=b"{not json", headers=headers)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "json_invalid"
+
+
+def test_process_time_header():
+    """Test that responses carry the processing time header."""
+    response = client.get("/api/v1/health/live")
+    assert float(response.headers["X-Process-Time"]) >= 0
+
+
+def test_openapi_schema_is_served():
+    """Test that the OpenAPI schema is served and stable across requests."""
+    first = client.get("/openapi.json")
+    second = client.get("/openapi.json")
+    assert first.status_code == 200
+    assert "/api/v1/diagnosis/" in first.json()["paths"]
+    assert first.content == second.content
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,141 @@
+"""Tests for rate limiting helpers."""
+
+import asyncio
+import pytest
+from types import SimpleNamespace
+from app.exceptions.custom_exceptions import RateLimitError
+from app.middleware.rate_limiter import (
+    ClientIdentifierMiddleware,
+    RateLimiter,
+    RateLimitMiddleware,
+    _LocalCounts,
+    local_admission_budget,
+    rate_limiter,
+)
+
+
+def resolve_identifier(trust_forwarded_for, headers, client=("10.0.0.5", 1234)):
+    """Run the middleware over a bare scope and return the resolved identifier."""
+    seen = {}
+
+    async def app(scope, receive, send):
+        seen.update(scope["state"])
+
+    scope = {"type": "http", "headers": headers, "client": client}
+    asyncio.run(ClientIdentifierMiddleware(app, trust_forwarded_for)(scope, None, None))
+    return seen["rl_identifier"]
+
+
+def test_client_identifier_uses_peer_address():
+    """Test that X-Forwarded-For is ignored unless explicitly trusted."""
+    headers = [(b"x-forwarded-for", b"1.1.1.1, 2.2.2.2")]
+    assert resolve_identifier(False, headers) == "10.0.0.5"
+    assert resolve_identifier(False, [], client=None) == "unknown"
+
+
+def test_client_identifier_uses_last_forwarded_hop():
+    """Test that only the proxy-appended X-Forwarded-For entry is trusted."""
+    headers = [(b"x-forwarded-for", b"1.1.1.1, 2.2.2.2")]
+    assert resolve_identifier(True, headers) == "2.2.2.2"
+    assert resolve_identifier(True, []) == "10.0.0.5"
+
+
+def test_window_key_uses_hash_tag():
+    """Test that window keys hash-tag the identifier and bucket by window."""
+    limiter = RateLimiter()
+    limiter.window_seconds = 60
+    assert limiter._window_key("10.0.0.5", 125) == b"rl:{10.0.0.5}:2"
+
+
+def make_limiters(workers, limit, counts):
+    """Build limiters for separate workers sharing one in-memory window counter."""
+    async def incr_window(key, increment=1):
+        counts[key] = counts.get(key, 0) + increment
+        return counts[key]
+
+    limiters = []
+    for _ in range(workers):
+        limiter = RateLimiter()
+        limiter.enabled = True
+        limiter.window_seconds = 3600
+        limiter.requests_limit = limit
+        limiter._sync_threshold = int(limit * 0.8)
+        limiter._local_budget = local_admission_budget(limit, workers)
+        limiter.redis_client = object()
+        limiter._incr_window = incr_window
+        limiters.append(limiter)
+    return limiters
+
+
+def client_request(identifier):
+    """Build a request carrying a resolved rate limit identifier."""
+    return SimpleNamespace(scope={"state": {"rl_identifier": identifier}})
+
+
+def test_local_admission_overshoot_is_bounded():
+    """Test that workers admitting locally exceed the limit by at most 10% of it."""
+    workers, limit = 4, 200
+
+    async def run():
+        limiters = make_limiters(workers, limit, {})
+        # Worst case: one worker drives the shared count to the limit while the
+        # others still hold the stale count from the start of the window
+        admitted = 0
+        for limiter in limiters:
+            for _ in range(limit * 2):
+                try:
+                    await limiter.check_rate_limit(client_request("10.0.0.5"))
+                    admitted += 1
+                except RateLimitError:
+                    break
+        return admitted
+
+    assert local_admission_budget(limit, workers) > 0
+    assert limit <= asyncio.run(run()) <= limit * 1.1
+    assert local_admission_budget(30, workers) == 0
+
+
+def test_evicted_local_counts_are_flushed():
+    """Test that requests admitted locally are charged when their entry is evicted."""
+    counts = {}
+
+    async def run():
+        limiter, = make_limiters(1, 200, counts)
+        limiter._local_counts = _LocalCounts(1, limiter._flush_deadline, limiter._schedule_flush)
+        await limiter.check_rate_limit(client_request("10.0.0.5"))
+        assert counts == {}
+        await limiter.check_rate_limit(client_request("10.0.0.6"))
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert list(counts.values()) == [1]
+
+
+def test_rate_limit_middleware_rejects_before_app(monkeypatch):
+    """Test that throttled requests get a 429 without reaching the application."""
+    async def deny(request, user_id=None):
+        raise RateLimitError(rate_limiter.limit_message)
+
+    monkeypatch.setattr(rate_limiter, "check_rate_limit", deny)
+    reached = []
+    sent = []
+
+    async def app(scope, receive, send):
+        reached.append(scope["path"])
+
+    async def send(message):
+        sent.append(message)
+
+    middleware = RateLimitMiddleware(app, paths=["/limited"])
+    base = {"type": "http", "headers": [], "client": ("10.0.0.5", 1234)}
+    asyncio.run(middleware({**base, "method": "POST", "path": "/limited"}, None, send))
+    asyncio.run(middleware({**base, "method": "GET", "path": "/limited"}, None, send))
+
+    assert reached == ["/limited"]
+    assert sent[0]["status"] == 429
+    assert (b"retry-after", str(rate_limiter.window_seconds).encode()) in sent[0]["headers"]
+    assert b"Rate limit exceeded" in sent[1]["body"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,40 @@
+"""Tests for application settings."""
+
+import pytest
+from pydantic import ValidationError
+from app.config.settings import Settings, get_settings, settings
+
+
+def test_get_settings_returns_singleton():
+    """Test that settings are constructed once per process."""
+    assert get_settings() is get_settings()
+    assert get_settings() is settings
+
+
+def test_comma_separated_lists_are_parsed_once():
+    """Test that list helpers strip entries and cache the parsed tuple."""
+    test_settings = Settings(
+        cors_origins="http://a.example, https://b.example",
+        allowed_services="svc-a ,svc-b",
+    )
+    assert test_settings.cors_origins_list == ("http://a.example", "https://b.example")
+    assert test_settings.allowed_services_list == ("svc-a", "svc-b")
+    assert test_settings.cors_origins_list is test_settings.cors_origins_list
+    assert test_settings.cors_origins_set == frozenset({"http://a.example", "https://b.example"})
+    assert test_settings.rate_limit_exempt_networks_list == ()
+
+
+def test_redis_url():
+    """Test Redis URL composition."""
+    test_settings = Settings(redis_host="cache", redis_port=6380, redis_db=2, redis_password="pw", redis_ssl=True)
+    assert test_settings.redis_url == "rediss://:pw@cache:6380/2"
+
+
+def test_settings_are_frozen():
+    """Test that settings cannot be mutated after construction."""
+    with pytest.raises(ValidationError):
+        settings.debug = True
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])